@@ -2,30 +2,76 @@
 arXiv API client for fetching academic papers.
 """
 import asyncio
+import hashlib
+import json
+import re
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import arxiv
 
-from ..pdf.pdf_handler import download_pdf
+from ..db.database import PaperDatabase
+from ..pdf.pdf_handler import download_pdfs
+from ..utils.http_client import request_with_retry
+from ..utils.rate_limit import RateLimiter
+
+ARXIV_VERSION_SUFFIX = re.compile(r"v\d+$")
+# Largest number of IDs the Semantic Scholar batch endpoint accepts per request
+CITATION_BATCH_SIZE = 500
+# Citation data of papers Semantic Scholar does not know
+DEFAULT_CITATION_DATA = {"citation_count": 0, "venue": "", "venue_impact_score": 0.0}
 
 
 class ArxivClient:
     """Client for interacting with the arXiv API."""
     
-    def __init__(self, papers_dir: str, api_delay: float = 1.0):
+    def __init__(self, papers_dir: str, api_delay: float = 1.0,
+                 citation_cache: Optional[PaperDatabase] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 response_cache: Optional[PaperDatabase] = None):
         """
         Initialize the arXiv client.
         
         Args:
             papers_dir: Directory to save downloaded PDFs
             api_delay: Delay between API calls in seconds
+            citation_cache: Database used to cache Semantic Scholar citation data
+            rate_limiter: Limiter for Semantic Scholar citation requests, one
+                request per api_delay seconds by default
+            response_cache: Database used to cache arXiv search results
         """
         self.papers_dir = papers_dir
         self.api_delay = api_delay
+        self.citation_cache = citation_cache
+        self.rate_limiter = rate_limiter or RateLimiter(1, api_delay)
+        self.response_cache = response_cache
+        self._arxiv_clients: Dict[int, arxiv.Client] = {}
+    
+    def _get_arxiv_client(self, page_size: int) -> arxiv.Client:
+        """
+        Get an arxiv.Client for the given page size, reusing earlier ones.
+        
+        A reused client keeps its HTTP session alive between searches and
+        spaces its requests by delay_seconds as the arXiv API asks.
+        
+        Args:
+            page_size: Number of results fetched per API request
+            
+        Returns:
+            arxiv.Client instance
+        """
+        client = self._arxiv_clients.get(page_size)
+        if client is None:
+            client = arxiv.Client(
+                page_size=page_size,
+                delay_seconds=3.0,
+                num_retries=3
+            )
+            self._arxiv_clients[page_size] = client
+        return client
     
     async def search(self, query: str, limit: int = 5, min_citations: int = 0, 
-                   sort_by: str = "relevance") -> List[Dict[str, Any]]:
+                   sort_by: str = "relevance", download: bool = True) -> List[Dict[str, Any]]:
         """
         Search for papers on arXiv.
         
@@ -34,17 +80,12 @@ class ArxivClient:
             limit: Maximum number of results
             min_citations: Minimum number of citations
             sort_by: Sort criteria ("relevance", "recency", "citations")
+            download: Whether to download the PDFs of the results
             
         Returns:
             List of paper dictionaries
         """
         try:
-            client = arxiv.Client(
-                page_size=limit * 2,
-                delay_seconds=3.0,
-                num_retries=3
-            )
-            
             search_criteria = arxiv.SortCriterion.Relevance
             if sort_by == "recency":
                 search_criteria = arxiv.SortCriterion.SubmittedDate
@@ -56,40 +97,25 @@ class ArxivClient:
             )
             
             arxiv_papers = []
-            citation_tasks = []
             
-            for paper in client.results(search):
-                paper_id = paper.entry_id.split("/")[-1]
-                arxiv_id = paper_id
-                
+            for entry in await self._search_entries(search):
                 paper_data = {
-                    "paper_id": paper_id,
-                    "title": paper.title,
-                    "authors": ", ".join([author.name for author in paper.authors]),
-                    "abstract": paper.summary,
-                    "url": paper.entry_id,
-                    "pdf_url": paper.pdf_url,
-                    "published_date": paper.published.year if hasattr(paper.published, "year") else "",
+                    "paper_id": entry["paper_id"],
+                    "title": entry["title"],
+                    "authors": entry["authors"],
+                    "abstract": entry["abstract"],
+                    "url": entry["url"],
+                    "pdf_url": entry["pdf_url"],
+                    "published_date": int(entry["published"][:4]) if entry["published"] else "",
                     "source": "arXiv",
                     "keywords": query,
-                    "arxiv_id": arxiv_id
+                    "arxiv_id": entry["paper_id"],
+                    "doi": entry["doi"]
                 }
                 
                 arxiv_papers.append(paper_data)
-                citation_tasks.append(self._get_citation_data(arxiv_id))
             
-            if citation_tasks:
-                batch_size = 5
-                results = []
-                
-                for i in range(0, len(citation_tasks), batch_size):
-                    batch = citation_tasks[i:i+batch_size]
-                    batch_results = await asyncio.gather(*batch)
-                    results.extend(batch_results)
-                    if i + batch_size < len(citation_tasks):
-                        await asyncio.sleep(self.api_delay)
-            else:
-                results = []
+            results = await self._get_citation_data([paper["arxiv_id"] for paper in arxiv_papers])
             
             final_results = []
             for paper_data, citation_info in zip(arxiv_papers, results):
@@ -101,23 +127,23 @@ class ArxivClient:
                 paper_data["venue"] = citation_info.get("venue", "")
                 paper_data["venue_impact_score"] = citation_info.get("venue_impact_score", 0.0)
                 
-                pdf_path = await download_pdf(paper_data["pdf_url"], paper_data["paper_id"], self.papers_dir)
-                
-                paper_data["pdf_path"] = pdf_path
-                paper_data["full_text_available"] = 1 if pdf_path else 0
-                
                 final_results.append(paper_data)
             
             if sort_by == "citations":
                 final_results.sort(key=lambda x: x["citation_count"], reverse=True)
             
-            return final_results[:limit]
+            # Only download PDFs for the papers that are actually returned
+            final_results = final_results[:limit]
+            if download:
+                await download_pdfs(final_results, self.papers_dir)
+            
+            return final_results
         except Exception as e:
             print(f"arXiv search error: {e}")
             return []
     
     async def search_by_date(self, query: str, start_date: str, end_date: str, 
-                           limit: int = 5) -> List[Dict[str, Any]]:
+                           limit: int = 5, download: bool = True) -> List[Dict[str, Any]]:
         """
         Search for papers within a date range.
         
@@ -126,6 +152,7 @@ class ArxivClient:
             start_date: Start date in YYYYMMDD format
             end_date: End date in YYYYMMDD format
             limit: Maximum number of results
+            download: Whether to download the PDFs of the results
             
         Returns:
             List of paper dictionaries
@@ -134,12 +161,6 @@ class ArxivClient:
             date_filter = f" AND submittedDate:[{start_date} TO {end_date}]"
             full_query = query + date_filter
             
-            client = arxiv.Client(
-                page_size=limit * 2,
-                delay_seconds=3.0,
-                num_retries=3
-            )
-            
             search = arxiv.Search(
                 query=full_query,
                 max_results=limit * 2,
@@ -147,40 +168,25 @@ class ArxivClient:
             )
             
             arxiv_papers = []
-            citation_tasks = []
             
-            for paper in client.results(search):
-                paper_id = paper.entry_id.split("/")[-1]
-                arxiv_id = paper_id
-                
+            for entry in await self._search_entries(search):
                 paper_data = {
-                    "paper_id": paper_id,
-                    "title": paper.title,
-                    "authors": ", ".join([author.name for author in paper.authors]),
-                    "abstract": paper.summary,
-                    "url": paper.entry_id,
-                    "pdf_url": paper.pdf_url,
-                    "published_date": paper.published.strftime("%Y-%m-%d") if hasattr(paper, "published") else "",
+                    "paper_id": entry["paper_id"],
+                    "title": entry["title"],
+                    "authors": entry["authors"],
+                    "abstract": entry["abstract"],
+                    "url": entry["url"],
+                    "pdf_url": entry["pdf_url"],
+                    "published_date": entry["published"],
                     "source": "arXiv",
                     "keywords": query,
-                    "arxiv_id": arxiv_id
+                    "arxiv_id": entry["paper_id"],
+                    "doi": entry["doi"]
                 }
                 
                 arxiv_papers.append(paper_data)
-                citation_tasks.append(self._get_citation_data(arxiv_id))
             
-            if citation_tasks:
-                batch_size = 5
-                results = []
-                
-                for i in range(0, len(citation_tasks), batch_size):
-                    batch = citation_tasks[i:i+batch_size]
-                    batch_results = await asyncio.gather(*batch)
-                    results.extend(batch_results)
-                    if i + batch_size < len(citation_tasks):
-                        await asyncio.sleep(self.api_delay)
-            else:
-                results = []
+            results = await self._get_citation_data([paper["arxiv_id"] for paper in arxiv_papers])
             
             final_results = []
             for paper_data, citation_info in zip(arxiv_papers, results):
@@ -188,52 +194,123 @@ class ArxivClient:
                 paper_data["venue"] = citation_info.get("venue", "")
                 paper_data["venue_impact_score"] = citation_info.get("venue_impact_score", 0.0)
                 
-                pdf_path = await download_pdf(paper_data["pdf_url"], paper_data["paper_id"], self.papers_dir)
-                
-                paper_data["pdf_path"] = pdf_path
-                paper_data["full_text_available"] = 1 if pdf_path else 0
-                
                 final_results.append(paper_data)
             
+            if download:
+                await download_pdfs(final_results, self.papers_dir)
+            
             return final_results
         except Exception as e:
             print(f"arXiv date range search error: {e}")
             return []
     
-    async def _get_citation_data(self, arxiv_id: str) -> Dict[str, Any]:
+    async def _search_entries(self, search: arxiv.Search) -> List[Dict[str, Any]]:
         """
-        Get citation data for an arXiv paper from Semantic Scholar.
+        Run an arXiv search, answering from the response cache when possible.
         
         Args:
-            arxiv_id: arXiv ID
+            search: Search to run
             
         Returns:
-            Dictionary with citation information
+            Results as dictionaries with paper_id, title, authors, abstract, url,
+            pdf_url, published (YYYY-MM-DD) and doi
         """
-        import httpx
+        key = hashlib.sha1(
+            f"arxiv?{search.query}|{search.max_results}|{search.sort_by.value}".encode("utf-8")
+        ).hexdigest()
+        if self.response_cache:
+            # Read and written in worker threads, like the citation cache
+            body = await asyncio.to_thread(self.response_cache.get_cached_response, key)
+            if body is not None:
+                return json.loads(body)
+        
+        client = self._get_arxiv_client(search.max_results)
+        # The arxiv library pages with blocking requests and sleeps, so run it in a thread
+        results = await asyncio.to_thread(list, client.results(search))
+        
+        entries = [{
+            "paper_id": result.entry_id.split("/")[-1],
+            "title": result.title,
+            "authors": ", ".join([author.name for author in result.authors]),
+            "abstract": result.summary,
+            "url": result.entry_id,
+            "pdf_url": result.pdf_url,
+            "published": result.published.strftime("%Y-%m-%d") if result.published else "",
+            "doi": result.doi
+        } for result in results]
         
-        url = f"https://api.semanticscholar.org/graph/v1/paper/arXiv:{arxiv_id}"
+        if self.response_cache:
+            await asyncio.to_thread(self.response_cache.save_cached_response, key,
+                                    json.dumps(entries, ensure_ascii=False))
+        return entries
+    
+    async def _get_citation_data(self, arxiv_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get citation data for several arXiv papers from Semantic Scholar.
+        
+        Recently fetched data is taken from the citation cache; the remaining
+        papers are looked up with the batch endpoint, up to
+        CITATION_BATCH_SIZE IDs per request.
+        
+        Args:
+            arxiv_ids: arXiv IDs
+            
+        Returns:
+            Citation information for each ID, in the same order
+        """
+        if not arxiv_ids:
+            return []
+        
+        # Semantic Scholar knows arXiv papers by their unversioned ID
+        keys = [f"arXiv:{ARXIV_VERSION_SUFFIX.sub('', arxiv_id)}" for arxiv_id in arxiv_ids]
+        # The cache is read and written in worker threads so that a long database
+        # operation holding its lock does not stall the event loop
+        citations = {}
+        if self.citation_cache:
+            citations = await asyncio.to_thread(self.citation_cache.get_cached_citations, keys)
+        
+        missing = list(dict.fromkeys(key for key in keys if key not in citations))
+        for start in range(0, len(missing), CITATION_BATCH_SIZE):
+            fetched = await self._fetch_citation_data(missing[start:start + CITATION_BATCH_SIZE])
+            if self.citation_cache:
+                await asyncio.to_thread(self.citation_cache.save_cached_citations, fetched)
+            citations.update(fetched)
+        
+        return [dict(citations.get(key, DEFAULT_CITATION_DATA)) for key in keys]
+    
+    async def _fetch_citation_data(self, paper_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch citation data from the Semantic Scholar batch endpoint.
+        
+        Args:
+            paper_ids: Semantic Scholar paper IDs such as "arXiv:2101.00001"
+            
+        Returns:
+            Dictionary mapping each requested ID to its citation information,
+            DEFAULT_CITATION_DATA for IDs Semantic Scholar does not know, or
+            an empty dictionary if the request failed
+        """
+        url = "https://api.semanticscholar.org/graph/v1/paper/batch"
         params = {
             "fields": "citationCount,venue,influentialCitationCount"
         }
         
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
+            response = await request_with_retry("POST", url, rate_limiter=self.rate_limiter,
+                                                params=params, json={"ids": paper_ids}, timeout=15.0)
+            if response.status_code == 200:
+                # Unknown IDs come back as null entries in their position; they get the
+                # default values so that they are cached too and not asked for again
+                return {
+                    paper_id: {
                         "citation_count": data.get("citationCount", 0) or 0,
                         "venue": data.get("venue", ""),
                         "venue_impact_score": 0.0
-                    }
-                elif response.status_code == 429:
-                    print("Reached Semantic Scholar API rate limit. Waiting...")
-                    await asyncio.sleep(5)
-                    return {"citation_count": 0, "venue": "", "venue_impact_score": 0.0}
-                else:
-                    print(f"Semantic Scholar API call error: status code {response.status_code}")
-                    return {"citation_count": 0, "venue": "", "venue_impact_score": 0.0}
+                    } if data else dict(DEFAULT_CITATION_DATA)
+                    for paper_id, data in zip(paper_ids, response.json())
+                }
+            else:
+                print(f"Semantic Scholar API call error: status code {response.status_code}")
         except Exception as e:
             print(f"Citation data retrieval error: {e}")
-            return {"citation_count": 0, "venue": "", "venue_impact_score": 0.0}
+        return {}
@@ -2,34 +2,44 @@
 Semantic Scholar API client for fetching academic papers.
 """
 import asyncio
+import hashlib
+import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import httpx
-
-from ..pdf.pdf_handler import download_pdf
+from ..db.database import PaperDatabase
+from ..pdf.pdf_handler import download_pdfs
+from ..utils.http_client import request_with_retry
+from ..utils.rate_limit import RateLimiter
 
 
 class SemanticScholarClient:
     """Client for interacting with the Semantic Scholar API."""
     
-    def __init__(self, papers_dir: str, api_delay: float = 1.0):
+    def __init__(self, papers_dir: str, api_delay: float = 1.0,
+                 response_cache: Optional[PaperDatabase] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize the Semantic Scholar client.
         
         Args:
             papers_dir: Directory to save downloaded PDFs
             api_delay: Delay between API calls in seconds
+            response_cache: Database used to cache search responses
+            rate_limiter: Limiter for Semantic Scholar requests, one request
+                per api_delay seconds by default
         """
         self.papers_dir = papers_dir
         self.api_delay = api_delay
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter or RateLimiter(1, api_delay)
         self.api_base_url = "https://api.semanticscholar.org/graph/v1"
         self.headers = {
             "Accept": "application/json"
         }
     
     async def search(self, query: str, limit: int = 5, min_citations: int = 0, 
-                   sort_by: str = "relevance") -> List[Dict[str, Any]]:
+                   sort_by: str = "relevance", download: bool = True) -> List[Dict[str, Any]]:
         """
         Search for papers on Semantic Scholar.
         
@@ -38,12 +48,13 @@ class SemanticScholarClient:
             limit: Maximum number of results
             min_citations: Minimum number of citations
             sort_by: Sort criteria ("relevance", "citations", "recency")
+            download: Whether to download the PDFs of the results
             
         Returns:
             List of paper dictionaries
         """
         url = f"{self.api_base_url}/paper/search"
-        fields = "title,authors,abstract,url,year,venue,openAccessPdf,citationCount,venue,influentialCitationCount"
+        fields = "title,authors,abstract,url,year,venue,openAccessPdf,citationCount,venue,influentialCitationCount,externalIds"
         
         params = {
             "query": query,
@@ -52,69 +63,64 @@ class SemanticScholarClient:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params, headers=self.headers)
-                if response.status_code != 200:
-                    if response.status_code == 429:
-                        print("Reached Semantic Scholar API rate limit. Waiting...")
-                        await asyncio.sleep(5)
-                    else:
-                        print(f"Semantic Scholar API search error: status code {response.status_code}")
-                    return []
-                
-                data = response.json()
-                all_results = []
-                
-                for paper in data.get("data", []):
-                    if not paper.get("abstract"):
-                        continue
-                        
-                    citation_count = paper.get("citationCount", 0) or 0
-                    
-                    if citation_count < min_citations:
-                        continue
-                        
-                    authors = [author.get("name", "") for author in paper.get("authors", [])]
-                    venue = paper.get("venue", "")
-                    
-                    pdf_url = None
-                    if "openAccessPdf" in paper and paper["openAccessPdf"]:
-                        pdf_url = paper["openAccessPdf"].get("url")
-                    
-                    paper_data = {
-                        "paper_id": paper.get("paperId", ""),
-                        "title": paper.get("title", ""),
-                        "authors": ", ".join(authors),
-                        "abstract": paper.get("abstract", ""),
-                        "url": paper.get("url", ""),
-                        "pdf_url": pdf_url,
-                        "published_date": paper.get("year", ""),
-                        "source": "Semantic Scholar",
-                        "keywords": query,
-                        "citation_count": citation_count,
-                        "venue": venue,
-                        "venue_impact_score": 0.0
-                    }
-                    
-                    pdf_path = None
-                    if pdf_url:
-                        pdf_path = await download_pdf(pdf_url, paper_data["paper_id"], self.papers_dir)
+            data = await self._get_json(url, params)
+            if data is None:
+                return []
+            
+            all_results = []
+            
+            for paper in data.get("data", []):
+                if not paper.get("abstract"):
+                    continue
                     
-                    paper_data["pdf_path"] = pdf_path
-                    paper_data["full_text_available"] = 1 if pdf_path else 0
+                citation_count = paper.get("citationCount", 0) or 0
+                
+                if citation_count < min_citations:
+                    continue
                     
-                    all_results.append(paper_data)
+                authors = [author.get("name", "") for author in paper.get("authors", [])]
+                venue = paper.get("venue", "")
+                
+                pdf_url = None
+                if "openAccessPdf" in paper and paper["openAccessPdf"]:
+                    pdf_url = paper["openAccessPdf"].get("url")
+                
+                external_ids = paper.get("externalIds") or {}
                 
-                if sort_by == "citations":
-                    all_results.sort(key=lambda x: x["citation_count"], reverse=True)
+                paper_data = {
+                    "paper_id": paper.get("paperId", ""),
+                    "title": paper.get("title", ""),
+                    "authors": ", ".join(authors),
+                    "abstract": paper.get("abstract", ""),
+                    "url": paper.get("url", ""),
+                    "pdf_url": pdf_url,
+                    "published_date": paper.get("year", ""),
+                    "source": "Semantic Scholar",
+                    "keywords": query,
+                    "citation_count": citation_count,
+                    "venue": venue,
+                    "venue_impact_score": 0.0,
+                    "doi": external_ids.get("DOI"),
+                    "arxiv_id": external_ids.get("ArXiv")
+                }
                 
-                return all_results[:limit]
+                all_results.append(paper_data)
+            
+            if sort_by == "citations":
+                all_results.sort(key=lambda x: x["citation_count"], reverse=True)
+            
+            # Only download PDFs for the papers that are actually returned
+            all_results = all_results[:limit]
+            if download:
+                await download_pdfs(all_results, self.papers_dir)
+            
+            return all_results
         except Exception as e:
             print(f"Semantic Scholar search error: {e}")
             return []
     
     async def search_by_date(self, query: str, start_year: int, end_year: int, 
-                           limit: int = 5) -> List[Dict[str, Any]]:
+                           limit: int = 5, download: bool = True) -> List[Dict[str, Any]]:
         """
         Search for papers published within a year range.
         
@@ -123,6 +129,7 @@ class SemanticScholarClient:
             start_year: Start year
             end_year: End year
             limit: Maximum number of results
+            download: Whether to download the PDFs of the results
             
         Returns:
             List of paper dictionaries
@@ -134,74 +141,97 @@ class SemanticScholarClient:
             # Calculate papers per year to maintain overall limit
             papers_per_year = max(1, limit // len(years_to_search)) if years_to_search else limit
             
-            for year in years_to_search:
-                url = f"{self.api_base_url}/paper/search"
-                fields = "title,authors,abstract,url,year,venue,openAccessPdf,citationCount,venue,influentialCitationCount"
-                
-                params = {
+            url = f"{self.api_base_url}/paper/search"
+            fields = "title,authors,abstract,url,year,venue,openAccessPdf,citationCount,venue,influentialCitationCount,externalIds"
+            
+            year_params = [
+                {
                     "query": query,
                     "limit": papers_per_year * 2,  # Request more to account for filtering
                     "fields": fields,
                     "year": year
                 }
+                for year in years_to_search
+            ]
+            
+            # The rate limiter spaces the requests, so all years can be queried at once
+            responses = await asyncio.gather(*(self._get_json(url, params) for params in year_params))
+            
+            for data in responses:
+                if data is None:
+                    continue
                 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.get(url, params=params, headers=self.headers)
-                    if response.status_code != 200:
-                        if response.status_code == 429:
-                            print("Reached Semantic Scholar API rate limit. Waiting...")
-                            await asyncio.sleep(5)
-                        else:
-                            print(f"Semantic Scholar API search error: status code {response.status_code}")
+                for paper in data.get("data", []):
+                    if not paper.get("abstract"):
                         continue
+                        
+                    authors = [author.get("name", "") for author in paper.get("authors", [])]
+                    venue = paper.get("venue", "")
+                    
+                    pdf_url = None
+                    if "openAccessPdf" in paper and paper["openAccessPdf"]:
+                        pdf_url = paper["openAccessPdf"].get("url")
                     
-                    data = response.json()
+                    external_ids = paper.get("externalIds") or {}
                     
-                    for paper in data.get("data", []):
-                        if not paper.get("abstract"):
-                            continue
-                            
-                        authors = [author.get("name", "") for author in paper.get("authors", [])]
-                        venue = paper.get("venue", "")
-                        
-                        pdf_url = None
-                        if "openAccessPdf" in paper and paper["openAccessPdf"]:
-                            pdf_url = paper["openAccessPdf"].get("url")
-                        
-                        paper_data = {
-                            "paper_id": paper.get("paperId", ""),
-                            "title": paper.get("title", ""),
-                            "authors": ", ".join(authors),
-                            "abstract": paper.get("abstract", ""),
-                            "url": paper.get("url", ""),
-                            "pdf_url": pdf_url,
-                            "published_date": str(paper.get("year", "")),
-                            "source": "Semantic Scholar",
-                            "keywords": query,
-                            "citation_count": paper.get("citationCount", 0) or 0,
-                            "venue": venue,
-                            "venue_impact_score": 0.0
-                        }
-                        
-                        pdf_path = None
-                        if pdf_url:
-                            pdf_path = await download_pdf(pdf_url, paper_data["paper_id"], self.papers_dir)
-                        
-                        paper_data["pdf_path"] = pdf_path
-                        paper_data["full_text_available"] = 1 if pdf_path else 0
-                        
-                        all_results.append(paper_data)
-                
-                # Add a delay between year queries to avoid rate limiting
-                await asyncio.sleep(self.api_delay)
+                    paper_data = {
+                        "paper_id": paper.get("paperId", ""),
+                        "title": paper.get("title", ""),
+                        "authors": ", ".join(authors),
+                        "abstract": paper.get("abstract", ""),
+                        "url": paper.get("url", ""),
+                        "pdf_url": pdf_url,
+                        "published_date": str(paper.get("year", "")),
+                        "source": "Semantic Scholar",
+                        "keywords": query,
+                        "citation_count": paper.get("citationCount", 0) or 0,
+                        "venue": venue,
+                        "venue_impact_score": 0.0,
+                        "doi": external_ids.get("DOI"),
+                        "arxiv_id": external_ids.get("ArXiv")
+                    }
+                    
+                    all_results.append(paper_data)
             
             # Sort by citation count and limit results
             all_results.sort(key=lambda x: x["citation_count"], reverse=True)
-            return all_results[:limit]
+            all_results = all_results[:limit]
+            if download:
+                await download_pdfs(all_results, self.papers_dir)
+            return all_results
         except Exception as e:
             print(f"Semantic Scholar date range search error: {e}")
             return []
     
+    async def _get_json(self, url: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        GET a Semantic Scholar API endpoint, answering from the response cache when possible.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            
+        Returns:
+            Decoded JSON response, or None if the request failed
+        """
+        key = hashlib.sha1(f"{url}?{sorted(params.items())}".encode("utf-8")).hexdigest()
+        if self.response_cache:
+            # The cache is read and written in worker threads so that a long database
+            # operation holding its lock does not stall the event loop
+            body = await asyncio.to_thread(self.response_cache.get_cached_response, key)
+            if body is not None:
+                return json.loads(body)
+        
+        response = await request_with_retry("GET", url, rate_limiter=self.rate_limiter,
+                                            params=params, headers=self.headers)
+        if response.status_code != 200:
+            print(f"Semantic Scholar API search error: status code {response.status_code}")
+            return None
+        
+        if self.response_cache:
+            await asyncio.to_thread(self.response_cache.save_cached_response, key, response.text)
+        return response.json()
+    
     def filter_papers_by_date(self, papers: List[Dict[str, Any]], 
                              start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """
@@ -1,12 +1,95 @@
 """
 Database operations for the paper collector.
 """
+import json
 import os
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
 
+# Applied to every connection; unlike journal_mode these do not persist in the file
+_CONNECTION_PRAGMAS = (
+    # In WAL mode NORMAL is still durable against application crashes and
+    # skips the fsync on every commit
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    # 64 MiB page cache (negative values are in KiB) instead of the default 2 MiB
+    "PRAGMA cache_size=-65536",
+    # Read large full_text values through a memory map instead of read() calls
+    "PRAGMA mmap_size=268435456",
+)
+
+# Number of full texts kept in memory between full text searches
+FULL_TEXT_CACHE_SIZE = 256
+
+# Columns of papers mirrored in the papers_fts full text index
+FTS_COLUMNS = ("title", "abstract", "keywords", "authors", "full_text")
+# The trigram tokenizer cannot match terms shorter than this
+FTS_MIN_TERM_LENGTH = 3
+# bm25() column weights that rank full text matches by the full_text column alone
+FULL_TEXT_BM25_WEIGHTS = ", ".join("1.0" if column == "full_text" else "0.0" for column in FTS_COLUMNS)
+
+# Every papers column except full_text, for queries that list or describe papers
+# without needing the (possibly megabytes long) extracted text
+PAPER_LIST_COLUMNS = (
+    "paper_id, title, authors, abstract, url, pdf_path, full_text_available, "
+    "published_date, source, keywords, collected_date, citation_count, venue, venue_impact_score"
+)
+
+# Statements run on every save are kept as constants so that the text is
+# identical each time and sqlite3 reuses its cached prepared statement
+_UPSERT_PAPER_SQL = '''
+INSERT INTO papers (
+    paper_id, title, authors, abstract, url, pdf_path,
+    full_text_available, full_text, published_date, source, keywords,
+    collected_date, citation_count, venue, venue_impact_score
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(paper_id) DO UPDATE SET
+    title = excluded.title, authors = excluded.authors, abstract = excluded.abstract,
+    url = excluded.url, pdf_path = excluded.pdf_path,
+    full_text_available = excluded.full_text_available,
+    full_text = COALESCE(excluded.full_text, full_text),
+    published_date = excluded.published_date, source = excluded.source,
+    keywords = excluded.keywords, citation_count = excluded.citation_count,
+    venue = excluded.venue, venue_impact_score = excluded.venue_impact_score
+'''
+_SAVE_FULL_TEXT_SQL = "UPDATE papers SET full_text = ?, full_text_available = 1 WHERE paper_id = ?"
+
+# Citation counts change slowly, so cached lookups stay valid for a week
+CITATION_CACHE_TTL = 7 * 24 * 60 * 60
+# Search results pick up new papers, so cached API responses expire after a day
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+
+
+def _fts_phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase that is matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor, rows: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Convert plain result tuples to dictionaries keyed by column name.
+    
+    Zipping tuples with the column names once per query is cheaper than
+    creating sqlite3.Row objects and converting each of them.
+    
+    Args:
+        cursor: Cursor that produced the rows
+        rows: Result rows
+        
+    Returns:
+        List of row dictionaries
+    """
+    columns = [description[0] for description in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
 class PaperDatabase:
     """Handles database operations for paper storage and retrieval."""
     
@@ -19,14 +102,58 @@ class PaperDatabase:
         """
         self.db_path = db_path
         self.connection = None
+        self._lock = threading.Lock()
+        self.fts_enabled = False
+        # paper_id -> full_text of recently searched papers, least recently used first
+        self._full_text_cache: "OrderedDict[str, str]" = OrderedDict()
         self.initialize()
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Open a new connection with the per-connection pragmas applied.
+        
+        Returns:
+            SQLite connection
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Use the shared connection for one unit of work.
+        
+        A single connection is kept open for the lifetime of the handler so
+        that the schema and page cache stay loaded between calls. Access is
+        serialized with a lock, which also lets tools call the database from
+        worker threads. The transaction is committed when the block exits
+        normally and rolled back on error.
+        
+        Yields:
+            SQLite connection
+        """
+        with self._lock:
+            if self.connection is None:
+                self.connection = self._open_connection()
+            conn = self.connection
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
     def initialize(self) -> None:
         """Initialize the database schema if it doesn't exist."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 c = conn.cursor()
                 
+                # WAL lets readers run alongside the writer and makes commits cheaper
+                c.execute("PRAGMA journal_mode=WAL")
+                
                 c.execute('''
                 CREATE TABLE IF NOT EXISTS papers (
                     paper_id TEXT PRIMARY KEY,
@@ -58,22 +185,138 @@ class PaperDatabase:
                 c.execute("CREATE INDEX IF NOT EXISTS idx_papers_citation_count ON papers(citation_count)")
                 c.execute("CREATE INDEX IF NOT EXISTS idx_papers_venue ON papers(venue)")
                 c.execute("CREATE INDEX IF NOT EXISTS idx_papers_source ON papers(source)")
+                c.execute("CREATE INDEX IF NOT EXISTS idx_papers_collected_date ON papers(collected_date DESC)")
+                c.execute("CREATE INDEX IF NOT EXISTS idx_papers_source_collected_date "
+                          "ON papers(source, collected_date DESC)")
+                # Partial index: only the papers with a PDF, newest first
+                c.execute("CREATE INDEX IF NOT EXISTS idx_papers_full_text_collected_date "
+                          "ON papers(collected_date DESC) WHERE full_text_available = 1")
+                # Covering partial index for get_top_venues: GROUP BY venue reads only
+                # (venue, citation_count) of papers with a venue, already in venue order
+                c.execute("CREATE INDEX IF NOT EXISTS idx_papers_venue_citation_count "
+                          "ON papers(venue, citation_count) WHERE venue IS NOT NULL AND venue != ''")
                 
-                conn.commit()
+                c.execute('''
+                CREATE TABLE IF NOT EXISTS citations_cache (
+                    paper_id TEXT PRIMARY KEY,
+                    json TEXT,
+                    fetched_at INTEGER
+                )
+                ''')
+                c.execute('''
+                CREATE TABLE IF NOT EXISTS api_response_cache (
+                    key TEXT PRIMARY KEY,
+                    body TEXT,
+                    fetched_at INTEGER
+                )
+                ''')
+                
+                self.fts_enabled = self._create_fts_index(c)
         except sqlite3.Error as e:
             print(f"Database initialization error: {e}")
+    
+    def _create_fts_index(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Create the FTS5 index over the searchable text columns of papers.
+        
+        The index is an external-content table kept in sync with the papers
+        table by triggers. The trigram tokenizer is used so that MATCH finds
+        arbitrary substrings, like the LIKE '%...%' searches it replaces, and
+        works for Japanese text without word boundaries. An index built by an
+        older version with different columns is dropped and rebuilt.
+        
+        Index rows refer to papers by its implicit rowid, which VACUUM may
+        renumber because papers has no INTEGER PRIMARY KEY. Compact the
+        database with vacuum(), which rebuilds the index afterwards; after a
+        VACUUM run by other means, run
+        INSERT INTO papers_fts(papers_fts) VALUES ('rebuild').
+        
+        Args:
+            cursor: SQLite cursor
+            
+        Returns:
+            True if the index is available, False if SQLite lacks FTS5 support
+        """
+        columns = ", ".join(FTS_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+        changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in FTS_COLUMNS)
+        
+        try:
+            cursor.execute("PRAGMA table_info(papers_fts)")
+            existing_columns = tuple(row[1] for row in cursor.fetchall())
+            
+            if existing_columns and existing_columns != FTS_COLUMNS:
+                for trigger in ("papers_fts_ai", "papers_fts_ad", "papers_fts_au"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                cursor.execute("DROP TABLE papers_fts")
+                existing_columns = ()
+            
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                {columns},
+                content='papers', content_rowid='rowid', tokenize='trigram'
+            )
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+                INSERT INTO papers_fts(rowid, {columns})
+                VALUES (new.rowid, {new_values});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+                INSERT INTO papers_fts(papers_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF {columns} ON papers
+            WHEN {changed} BEGIN
+                INSERT INTO papers_fts(papers_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO papers_fts(rowid, {columns})
+                VALUES (new.rowid, {new_values});
+            END
+            ''')
+            
+            # Index papers saved before the FTS table existed
+            if not existing_columns:
+                cursor.execute("INSERT INTO papers_fts(papers_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Full text index unavailable, falling back to scanning: {e}")
+            return False
 
+    def vacuum(self) -> None:
+        """
+        Compact the database file and rebuild the full text index.
+        
+        VACUUM may renumber the implicit rowids of papers that papers_fts
+        refers to, so the index is rebuilt from the papers table afterwards.
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute("VACUUM")
+                if self.fts_enabled:
+                    conn.execute("INSERT INTO papers_fts(papers_fts) VALUES ('rebuild')")
+        except sqlite3.Error as e:
+            print(f"Database vacuum error: {e}")
+    
     def close(self) -> None:
         """
         Close any open database connections.
         This should be called when the database is no longer needed.
         """
-        if self.connection is not None:
-            try:
-                self.connection.close()
-                self.connection = None
-            except sqlite3.Error as e:
-                print(f"Database close error: {e}")
+        with self._lock:
+            if self.connection is not None:
+                try:
+                    # Lets SQLite refresh statistics for indexes the session's queries used
+                    self.connection.execute("PRAGMA optimize")
+                    self.connection.close()
+                    self.connection = None
+                except sqlite3.Error as e:
+                    print(f"Database close error: {e}")
     
     def _add_column_if_not_exists(self, cursor: sqlite3.Cursor, table: str, column: str, 
                                 column_type: str) -> None:
@@ -86,91 +329,89 @@ class PaperDatabase:
             column: Column name
             column_type: SQL column type definition
         """
-        try:
+        # Checking the schema first avoids a failing ALTER TABLE on every start
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
             cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
-        except sqlite3.OperationalError:
-            # Column already exists
-            pass
 
-    def save_papers(self, papers: List[Dict[str, Any]]) -> int:
+    def save_papers(self, papers: List[Dict[str, Any]], collected_date: Optional[str] = None) -> int:
         """
         Save papers to the database, updating existing papers if needed.
         
         Args:
             papers: List of paper dictionaries
+            collected_date: Collection date (YYYY-MM-DD) recorded for new papers, today by default
             
         Returns:
             Number of new papers added
         """
-        if not papers:
-            return 0
+        return len(self.save_papers_with_new_ids(papers, collected_date))
+    
+    def save_papers_with_new_ids(self, papers: List[Dict[str, Any]],
+                                 collected_date: Optional[str] = None) -> Set[str]:
+        """
+        Save papers to the database and report which of them were new.
         
-        new_papers_count = 0
+        Args:
+            papers: List of paper dictionaries
+            collected_date: Collection date (YYYY-MM-DD) recorded for new papers, today by default
+            
+        Returns:
+            Set of IDs of the papers that were added
+        """
+        if not papers:
+            return set()
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 c = conn.cursor()
                 
+                # One query tells which papers are new; the upsert itself needs no lookup
+                paper_ids = list({paper["paper_id"] for paper in papers})
+                placeholders = ",".join("?" * len(paper_ids))
+                c.execute(f"SELECT paper_id FROM papers WHERE paper_id IN ({placeholders})", paper_ids)
+                existing_ids = {row[0] for row in c.fetchall()}
+                
+                if collected_date is None:
+                    collected_date = datetime.now().strftime("%Y-%m-%d")
+                new_ids = set()
+                rows = []
+                
                 for paper in papers:
-                    c.execute("SELECT paper_id FROM papers WHERE paper_id = ?", (paper["paper_id"],))
-                    existing_paper = c.fetchone()
+                    if paper["paper_id"] not in existing_ids:
+                        new_ids.add(paper["paper_id"])
+                        paper["collected_date"] = collected_date
                     
-                    if existing_paper is None:
-                        paper["collected_date"] = datetime.now().strftime("%Y-%m-%d")
-                        
-                        c.execute('''
-                        INSERT INTO papers (
-                            paper_id, title, authors, abstract, url, pdf_path, 
-                            full_text_available, published_date, source, keywords, collected_date,
-                            citation_count, venue, venue_impact_score
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            paper["paper_id"], 
-                            paper["title"], 
-                            paper["authors"], 
-                            paper["abstract"], 
-                            paper["url"], 
-                            paper.get("pdf_path", None),
-                            paper.get("full_text_available", 0),
-                            paper["published_date"], 
-                            paper["source"], 
-                            paper["keywords"], 
-                            paper["collected_date"],
-                            paper.get("citation_count", 0),
-                            paper.get("venue", ""),
-                            paper.get("venue_impact_score", 0.0)
-                        ))
-                        
-                        new_papers_count += 1
-                    else:
-                        # Update existing paper with new information
-                        c.execute('''
-                        UPDATE papers 
-                        SET title = ?, authors = ?, abstract = ?, url = ?, pdf_path = ?,
-                            full_text_available = ?, published_date = ?, source = ?, keywords = ?,
-                            citation_count = ?, venue = ?, venue_impact_score = ?
-                        WHERE paper_id = ?
-                        ''', (
-                            paper["title"],
-                            paper["authors"],
-                            paper["abstract"],
-                            paper["url"],
-                            paper.get("pdf_path", None),
-                            paper.get("full_text_available", 0),
-                            paper["published_date"],
-                            paper["source"],
-                            paper["keywords"],
-                            paper.get("citation_count", 0),
-                            paper.get("venue", ""),
-                            paper.get("venue_impact_score", 0.0),
-                            paper["paper_id"]
-                        ))
+                    # collected_date is only written when the row is inserted;
+                    # existing papers keep the date they were first collected on
+                    rows.append((
+                        paper["paper_id"], 
+                        paper["title"], 
+                        paper["authors"], 
+                        paper["abstract"], 
+                        paper["url"], 
+                        paper.get("pdf_path", None),
+                        paper.get("full_text_available", 0),
+                        paper.get("full_text"),
+                        paper["published_date"], 
+                        paper["source"], 
+                        paper["keywords"], 
+                        collected_date,
+                        paper.get("citation_count", 0),
+                        paper.get("venue", ""),
+                        paper.get("venue_impact_score", 0.0)
+                    ))
                 
-                conn.commit()
-                return new_papers_count
+                # One upsert per paper, all in the transaction committed by _connect()
+                c.executemany(_UPSERT_PAPER_SQL, rows)
+                for paper in papers:
+                    if paper.get("full_text"):
+                        self._full_text_cache.pop(paper["paper_id"], None)
+                
+                return new_ids
         except sqlite3.Error as e:
             print(f"Database save error: {e}")
-            return 0
+            return set()
     
     def save_full_text(self, paper_id: str, full_text: str) -> bool:
         """
@@ -187,18 +428,346 @@ class PaperDatabase:
             return False
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 c = conn.cursor()
-                c.execute(
-                    "UPDATE papers SET full_text = ?, full_text_available = 1 WHERE paper_id = ?",
-                    (full_text, paper_id)
-                )
-                conn.commit()
+                c.execute(_SAVE_FULL_TEXT_SQL, (full_text, paper_id))
+                self._full_text_cache.pop(paper_id, None)
                 return True
         except Exception as e:
             print(f"Full text save error: {e}")
             return False
     
+    def save_full_texts(self, full_texts: List[Tuple[str, str]]) -> int:
+        """
+        Save several extracted full texts in one transaction.
+        
+        Args:
+            full_texts: List of (paper_id, full_text) pairs
+            
+        Returns:
+            Number of texts saved
+        """
+        rows = [(full_text, paper_id) for paper_id, full_text in full_texts if full_text]
+        if not rows:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.executemany(_SAVE_FULL_TEXT_SQL, rows)
+                for _, paper_id in rows:
+                    self._full_text_cache.pop(paper_id, None)
+                return len(rows)
+        except Exception as e:
+            print(f"Full text save error: {e}")
+            return 0
+    
+    def mark_full_text_unavailable(self, paper_ids: List[str]) -> int:
+        """
+        Record that no text could be extracted from the PDFs of some papers.
+        
+        The papers are no longer returned by get_papers_without_full_text, so
+        missing, unreadable or empty PDFs are not extracted again on every
+        search. A later download that stores the paper again resets the flag.
+        
+        Args:
+            paper_ids: List of paper identifiers
+            
+        Returns:
+            Number of papers updated
+        """
+        if not paper_ids:
+            return 0
+        
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.executemany("UPDATE papers SET full_text_available = 0 WHERE paper_id = ?",
+                              [(paper_id,) for paper_id in paper_ids])
+                return c.rowcount
+        except Exception as e:
+            print(f"Full text availability update error: {e}")
+            return 0
+    
+    def get_cached_citations(self, paper_ids: List[str],
+                             max_age: int = CITATION_CACHE_TTL) -> Dict[str, Dict[str, Any]]:
+        """
+        Get citation data fetched within the last max_age seconds.
+        
+        Args:
+            paper_ids: IDs to look up
+            max_age: Maximum age of a cache entry in seconds
+            
+        Returns:
+            Dictionary mapping each cached ID to its citation data
+        """
+        if not paper_ids:
+            return {}
+        
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                placeholders = ",".join("?" * len(paper_ids))
+                c.execute(
+                    f"SELECT paper_id, json FROM citations_cache "
+                    f"WHERE paper_id IN ({placeholders}) AND fetched_at > ?",
+                    [*paper_ids, int(time.time()) - max_age]
+                )
+                return {paper_id: json.loads(data) for paper_id, data in c.fetchall()}
+        except Exception as e:
+            print(f"Citation cache read error: {e}")
+            return {}
+    
+    def save_cached_citations(self, citations: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Store fetched citation data in the cache.
+        
+        Entries older than CITATION_CACHE_TTL are deleted on each write so
+        that the table does not keep growing with stale rows.
+        
+        Args:
+            citations: Dictionary mapping paper IDs to citation data
+        """
+        if not citations:
+            return
+        
+        fetched_at = int(time.time())
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute("DELETE FROM citations_cache WHERE fetched_at <= ?",
+                          (fetched_at - CITATION_CACHE_TTL,))
+                c.executemany(
+                    "INSERT OR REPLACE INTO citations_cache (paper_id, json, fetched_at) VALUES (?, ?, ?)",
+                    [(paper_id, json.dumps(data), fetched_at) for paper_id, data in citations.items()]
+                )
+        except Exception as e:
+            print(f"Citation cache write error: {e}")
+    
+    def get_cached_response(self, key: str, max_age: int = RESPONSE_CACHE_TTL) -> Optional[str]:
+        """
+        Get an API response body stored within the last max_age seconds.
+        
+        Args:
+            key: Cache key of the request
+            max_age: Maximum age of a cache entry in seconds
+            
+        Returns:
+            Response body, or None on a cache miss
+        """
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute(
+                    "SELECT body FROM api_response_cache WHERE key = ? AND fetched_at > ?",
+                    (key, int(time.time()) - max_age)
+                )
+                row = c.fetchone()
+                return row[0] if row else None
+        except Exception as e:
+            print(f"Response cache read error: {e}")
+            return None
+    
+    def save_cached_response(self, key: str, body: str) -> None:
+        """
+        Store an API response body in the cache.
+        
+        Entries older than RESPONSE_CACHE_TTL are deleted on each write so
+        that the table does not keep growing with stale rows.
+        
+        Args:
+            key: Cache key of the request
+            body: Response body
+        """
+        fetched_at = int(time.time())
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute("DELETE FROM api_response_cache WHERE fetched_at <= ?",
+                          (fetched_at - RESPONSE_CACHE_TTL,))
+                c.execute(
+                    "INSERT OR REPLACE INTO api_response_cache (key, body, fetched_at) VALUES (?, ?, ?)",
+                    (key, body, fetched_at)
+                )
+        except Exception as e:
+            print(f"Response cache write error: {e}")
+    
+    def get_papers_without_full_text(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get papers that have a PDF but whose text has not been extracted yet.
+        
+        Args:
+            limit: Maximum number of papers to retrieve
+            
+        Returns:
+            List of dictionaries with paper_id and pdf_path
+        """
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute('''
+                SELECT paper_id, pdf_path FROM papers
+                WHERE full_text_available = 1 AND full_text IS NULL AND pdf_path IS NOT NULL
+                ORDER BY collected_date DESC
+                LIMIT ?
+                ''', (limit,))
+                return _rows_to_dicts(c, c.fetchall())
+        except Exception as e:
+            print(f"Error retrieving papers without full text: {e}")
+            return []
+    
+    def count_full_text_papers(self) -> int:
+        """
+        Count the papers whose full text is available.
+        
+        Returns:
+            Number of papers with full text
+        """
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                c.execute("SELECT COUNT(*) FROM papers WHERE full_text_available = 1")
+                return c.fetchone()[0]
+        except Exception as e:
+            print(f"Error counting full text papers: {e}")
+            return 0
+    
+    def search_full_text(self, query: str, limit: int = 5,
+                         context_chars: int = 100) -> List[Dict[str, Any]]:
+        """
+        Search the extracted full text of saved papers.
+        
+        Matching is case-insensitive and "*" in the query matches any run of
+        characters. Candidates are looked up in the FTS5 index, ranked by BM25,
+        and then checked against the exact pattern to build the surrounding
+        context. Without usable index terms, papers are scanned newest first.
+        
+        Args:
+            query: Text to search for
+            limit: Maximum number of papers to return
+            context_chars: Number of characters of context on each side of the match
+            
+        Returns:
+            List of dictionaries with paper_id, title, authors and context
+        """
+        segments = [segment for segment in query.split("*") if segment]
+        if not segments:
+            return []
+        
+        pattern = re.compile(".*?".join(re.escape(segment) for segment in segments), re.IGNORECASE)
+        indexed_segments = [segment for segment in segments if len(segment) >= FTS_MIN_TERM_LENGTH]
+        
+        try:
+            with self._connect() as conn:
+                c = conn.cursor()
+                
+                if self.fts_enabled and indexed_segments:
+                    phrases = " AND ".join(_fts_phrase(segment) for segment in indexed_segments)
+                    # Most relevant first: BM25 computed over the full_text column only
+                    c.execute(f'''
+                    SELECT p.rowid, p.paper_id, p.title, p.authors
+                    FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+                    WHERE papers_fts MATCH ? AND p.full_text_available = 1
+                    ORDER BY bm25(papers_fts, {FULL_TEXT_BM25_WEIGHTS})
+                    ''', (f"full_text : ({phrases})",))
+                else:
+                    query_sql = '''
+                    SELECT rowid, paper_id, title, authors FROM papers
+                    WHERE full_text_available = 1 AND full_text IS NOT NULL
+                    '''
+                    params = []
+                    # Let SQLite drop non-matching texts before they are copied into Python.
+                    # LIKE only folds ASCII case, so other terms are left to the regex.
+                    longest = max(segments, key=len)
+                    if longest.isascii():
+                        query_sql += " AND full_text LIKE ? ESCAPE '\\'"
+                        escaped = re.sub(r"([\\%_])", r"\\\1", longest)
+                        params.append(f"%{escaped}%")
+                    c.execute(query_sql + " ORDER BY collected_date DESC", params)
+                
+                # The candidates are listed without their text, so sorting them does not
+                # copy every matching full_text; each text is read only when checked
+                text_cursor = conn.cursor()
+                results = []
+                for rowid, paper_id, title, authors in c:
+                    full_text = self._cached_full_text(text_cursor, paper_id, rowid)
+                    match = pattern.search(full_text)
+                    if not match:
+                        continue
+                    
+                    start = max(0, match.start() - context_chars)
+                    end = min(len(full_text), match.end() + context_chars)
+                    context = full_text[start:end].replace("\n", " ")
+                    if start > 0:
+                        context = "..." + context
+                    if end < len(full_text):
+                        context = context + "..."
+                    
+                    results.append({
+                        "paper_id": paper_id,
+                        "title": title,
+                        "authors": authors,
+                        "context": context
+                    })
+                    if len(results) >= limit:
+                        break
+                
+                return results
+        except Exception as e:
+            print(f"Full text search error: {e}")
+            return []
+    
+    def _cached_full_text(self, cursor: sqlite3.Cursor, paper_id: str,
+                          rowid: Optional[int] = None) -> str:
+        """
+        Get the full text of a paper, reading it from the database on a cache miss.
+        
+        Must be called with the connection lock held.
+        
+        Args:
+            cursor: Cursor used to read the text on a cache miss
+            paper_id: Paper identifier used as the cache key
+            rowid: Row id of the paper, if known, to read the row without the index lookup
+            
+        Returns:
+            Full text of the paper, or an empty string if there is none
+        """
+        full_text = self._full_text_cache.get(paper_id)
+        if full_text is not None:
+            self._full_text_cache.move_to_end(paper_id)
+            return full_text
+        
+        if rowid is not None:
+            cursor.execute("SELECT full_text FROM papers WHERE rowid = ?", (rowid,))
+        else:
+            cursor.execute("SELECT full_text FROM papers WHERE paper_id = ?", (paper_id,))
+        row = cursor.fetchone()
+        full_text = (row[0] if row else None) or ""
+        self._full_text_cache[paper_id] = full_text
+        if len(self._full_text_cache) > FULL_TEXT_CACHE_SIZE:
+            self._full_text_cache.popitem(last=False)
+        return full_text
+    
+    def get_full_text(self, paper_id: str) -> Optional[str]:
+        """
+        Get the saved full text of a paper.
+        
+        Shares the in-memory cache used by search_full_text, so texts that
+        were just searched are returned without reading the database.
+        
+        Args:
+            paper_id: Paper identifier
+            
+        Returns:
+            Full text, or None if none has been saved
+        """
+        try:
+            with self._connect() as conn:
+                return self._cached_full_text(conn.cursor(), paper_id) or None
+        except Exception as e:
+            print(f"Error retrieving full text: {e}")
+            return None
+    
     def get_papers(self, keyword: str = "", source: str = "", limit: int = 10, 
                   sort_by: str = "date", sort_order: str = "desc",
                   filter_has_fulltext: bool = False, min_citations: int = 0,
@@ -233,16 +802,21 @@ class PaperDatabase:
                 sort_order = "desc"
             
             # Build the query
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
                 c = conn.cursor()
                 
-                query = "SELECT * FROM papers"
+                query = f"SELECT {PAPER_LIST_COLUMNS} FROM papers"
                 params = []
                 conditions = []
                 
                 # Build filter conditions
-                if keyword:
+                if keyword and self.fts_enabled and len(keyword) >= FTS_MIN_TERM_LENGTH:
+                    # Substring match through the full text index instead of four LIKE scans
+                    conditions.append(
+                        "rowid IN (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ?)"
+                    )
+                    params.append(f"{{title abstract keywords authors}} : {_fts_phrase(keyword)}")
+                elif keyword:
                     keyword_param = f"%{keyword}%"
                     conditions.append('''
                         (title LIKE ? OR abstract LIKE ? OR keywords LIKE ? OR authors LIKE ?)
@@ -307,37 +881,71 @@ class PaperDatabase:
                 papers = c.fetchall()
                 
                 # Convert to list of dictionaries
-                return [dict(paper) for paper in papers]
+                return _rows_to_dicts(c, papers)
         except Exception as e:
             print(f"Error retrieving papers: {e}")
             return []
     
-    def get_paper_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
+    def iter_papers(self, limit: int = 1000, chunk_size: int = 100) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Iterate over saved papers in chunks, newest first.
+        
+        Only one chunk of rows is held in memory at a time, which keeps
+        exports of large databases with full texts bounded in memory.
+        
+        Args:
+            limit: Maximum number of papers to retrieve
+            chunk_size: Number of papers per chunk
+            
+        Yields:
+            Lists of paper dictionaries
+        """
+        # A dedicated connection, so the shared one is not held while the caller
+        # processes each chunk
+        conn = self._open_connection()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT * FROM papers ORDER BY collected_date DESC LIMIT ?", (limit,))
+            
+            while True:
+                rows = c.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield _rows_to_dicts(c, rows)
+        except sqlite3.Error as e:
+            print(f"Error retrieving papers: {e}")
+        finally:
+            conn.close()
+    
+    def get_paper_by_id(self, paper_id: str, include_full_text: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get a paper by its ID or title.
         
         Args:
             paper_id: Paper ID or title
+            include_full_text: Whether to load the full_text column
             
         Returns:
             Paper dictionary or None if not found
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
                 c = conn.cursor()
                 
-                # Try exact match by ID
-                c.execute("SELECT * FROM papers WHERE paper_id = ?", (paper_id,))
+                # Exact match by ID first, then partial match by title, in one statement.
+                # SQLite runs UNION ALL arms in order and stops at the outer LIMIT, so
+                # the title scan only happens when no paper has this ID.
+                columns = "*" if include_full_text else PAPER_LIST_COLUMNS
+                c.execute(f'''
+                SELECT {columns} FROM papers WHERE paper_id = ?
+                UNION ALL
+                SELECT * FROM (SELECT {columns} FROM papers WHERE title LIKE ? LIMIT 1)
+                LIMIT 1
+                ''', (paper_id, f"%{paper_id}%"))
                 paper = c.fetchone()
                 
-                # If not found, try partial match by title
-                if not paper:
-                    c.execute("SELECT * FROM papers WHERE title LIKE ?", (f"%{paper_id}%",))
-                    paper = c.fetchone()
-                
                 if paper:
-                    return dict(paper)
+                    return _rows_to_dicts(c, [paper])[0]
                 return None
         except Exception as e:
             print(f"Error retrieving paper: {e}")
@@ -355,11 +963,10 @@ class PaperDatabase:
             List of paper dictionaries
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
                 c = conn.cursor()
                 
-                query = "SELECT * FROM papers"
+                query = f"SELECT {PAPER_LIST_COLUMNS} FROM papers"
                 params = []
                 
                 if venue:
@@ -374,7 +981,7 @@ class PaperDatabase:
                 c.execute(query, params)
                 papers = c.fetchall()
                 
-                return [dict(paper) for paper in papers]
+                return _rows_to_dicts(c, papers)
         except Exception as e:
             print(f"Error retrieving papers by venue: {e}")
             return []
@@ -390,7 +997,7 @@ class PaperDatabase:
             List of (venue, paper_count, avg_citations, max_citations) tuples
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 c = conn.cursor()
                 
                 c.execute('''
@@ -7,9 +7,9 @@ PDF handling functions for extracting text and metadata.
 
 try:
     # インストールされたパッケージとして実行する場合
-    from paper_collector.pdf.pdf_handler import extract_text_from_pdf
+    from paper_collector.pdf.pdf_handler import extract_text_from_pdf, extract_text_from_pdf_async, extract_texts_from_pdfs_async
 except ImportError:
     # 開発環境で直接実行する場合（相対インポート）
-    from .pdf_handler import extract_text_from_pdf
+    from .pdf_handler import extract_text_from_pdf, extract_text_from_pdf_async, extract_texts_from_pdfs_async
 
-__all__ = ['extract_text_from_pdf']
+__all__ = ['extract_text_from_pdf', 'extract_text_from_pdf_async', 'extract_texts_from_pdfs_async']
@@ -1,17 +1,101 @@
 """
 PDF handling utilities for downloading and extracting text from academic papers.
 """
+import asyncio
 import os
-from typing import Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import fitz
 import httpx
 from pathlib import Path
 
 from ..utils.file_utils import sanitize_filename
+from ..utils.http_client import get_client
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Upper bound on PDF downloads in flight across all concurrent searches
+MAX_CONCURRENT_DOWNLOADS = 5
+# Chunks are coalesced into writes of this size to keep write syscalls low
+WRITE_BUFFER_SIZE = 1024 * 1024
+# PDFs saved more recently than this are trusted without checking the remote size
+PDF_REVALIDATE_AGE = 7 * 24 * 60 * 60
+# Plain text extraction: ligatures expanded and words split across lines rejoined
+TEXT_FLAGS = (fitz.TEXTFLAGS_TEXT | fitz.TEXT_DEHYPHENATE) & ~fitz.TEXT_PRESERVE_LIGATURES
 
-async def download_pdf(url: str, paper_id: str, papers_dir: str) -> Optional[str]:
+
+# PyMuPDF is not thread-safe, so extractions running in worker threads take turns
+_fitz_lock = threading.Lock()
+
+_download_semaphore: Optional[asyncio.Semaphore] = None
+_download_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+# Downloads in progress by destination path, so concurrent searches that find
+# the same paper share one download
+_inflight_downloads: Dict[str, "asyncio.Task[Tuple[Optional[str], bool]]"] = {}
+
+
+def set_max_concurrent_downloads(limit: int) -> None:
+    """
+    Set how many PDF downloads may run at once.
+    
+    Args:
+        limit: Maximum number of concurrent downloads, at least 1
+    """
+    global MAX_CONCURRENT_DOWNLOADS, _download_semaphore
+    
+    MAX_CONCURRENT_DOWNLOADS = max(1, int(limit))
+    # Recreated with the new limit on the next download
+    _download_semaphore = None
+
+
+def _get_download_semaphore() -> asyncio.Semaphore:
+    """Get the process-wide download semaphore for the running event loop."""
+    global _download_semaphore, _download_semaphore_loop
+    
+    loop = asyncio.get_running_loop()
+    if _download_semaphore is None or _download_semaphore_loop is not loop:
+        _download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        _download_semaphore_loop = loop
+    return _download_semaphore
+
+
+def _pdf_file_path(paper_id: str, papers_dir: str) -> str:
+    """Return the path a paper's PDF is saved to."""
+    return os.path.join(papers_dir, f"{sanitize_filename(paper_id)}.pdf")
+
+
+def _is_fresh_pdf(file_path: str) -> bool:
+    """Whether file_path holds a non-empty PDF saved less than PDF_REVALIDATE_AGE ago."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return False
+    return stat.st_size > 0 and time.time() - stat.st_mtime < PDF_REVALIDATE_AGE
+
+
+async def _get_remote_size(client: httpx.AsyncClient, url: str) -> Optional[int]:
+    """
+    Get the size of a remote file from a HEAD request.
+    
+    Args:
+        client: HTTP client
+        url: URL of the file
+        
+    Returns:
+        Content-Length in bytes or None if it is unknown
+    """
+    try:
+        response = await client.head(url, follow_redirects=True)
+        if response.status_code != 200:
+            return None
+        return int(response.headers["content-length"])
+    except (httpx.HTTPError, KeyError, ValueError):
+        return None
+
+
+async def download_pdf(url: str, paper_id: str, papers_dir: str,
+                       client: Optional[httpx.AsyncClient] = None) -> Optional[str]:
     """
     Download a paper PDF and save it, returning the file path.
     
@@ -19,36 +103,174 @@ async def download_pdf(url: str, paper_id: str, papers_dir: str) -> Optional[str
         url: URL of the PDF
         paper_id: Identifier for the paper
         papers_dir: Directory to save PDFs
+        client: Optional HTTP client; the shared client is used by default
         
     Returns:
         Path to the downloaded PDF file or None if download failed
     """
-    safe_id = sanitize_filename(paper_id)
-    filename = f"{safe_id}.pdf"
-    file_path = os.path.join(papers_dir, filename)
+    pdf_path, _ = await _download_pdf(url, paper_id, papers_dir, client)
+    return pdf_path
+
+
+async def _download_pdf(url: str, paper_id: str, papers_dir: str,
+                        client: Optional[httpx.AsyncClient] = None) -> Tuple[Optional[str], bool]:
+    """
+    Download a paper PDF like download_pdf, also reporting whether the file was written.
     
+    Returns:
+        Path to the PDF file or None if download failed, and whether new bytes
+        were written to it
+    """
+    file_path = _pdf_file_path(paper_id, papers_dir)
+    
+    # Recently saved files are used without touching the network
+    if _is_fresh_pdf(file_path):
+        return file_path, False
+    
+    if client is None:
+        client = get_client()
+    
+    task = _inflight_downloads.get(file_path)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_fetch_pdf_limited(client, url, file_path))
+        _inflight_downloads[file_path] = task
+        task.add_done_callback(lambda done: _inflight_downloads.pop(file_path, None)
+                               if _inflight_downloads.get(file_path) is done else None)
+    # Shielded so that one caller being cancelled does not abort the download for the others
+    return await asyncio.shield(task)
+
+
+async def _fetch_pdf_limited(client: httpx.AsyncClient, url: str, file_path: str) -> Tuple[Optional[str], bool]:
+    """Run _fetch_pdf once a download slot is free."""
+    async with _get_download_semaphore():
+        return await _fetch_pdf(client, url, file_path)
+
+
+async def _fetch_pdf(client: httpx.AsyncClient, url: str, file_path: str) -> Tuple[Optional[str], bool]:
+    """
+    Fetch a PDF into file_path, validating an older local copy first.
+    
+    The body is written to a ".part" file that is renamed into place only
+    once complete, so file_path never holds a truncated PDF. A ".part" file
+    left by an interrupted download is resumed with a Range request.
+    
+    Args:
+        client: HTTP client
+        url: URL of the PDF
+        file_path: Destination path
+        
+    Returns:
+        file_path or None if the download failed, and whether the file was
+        (re)written; a local copy that is kept as it is counts as not written
+    """
     if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-        return file_path
+        # Older files are checked against the remote size, which costs one HEAD
+        remote_size = await _get_remote_size(client, url)
+        if remote_size is None:
+            return file_path, False
+        if remote_size == os.path.getsize(file_path):
+            # Validated: trust the file for another PDF_REVALIDATE_AGE
+            await asyncio.to_thread(os.utime, file_path)
+            return file_path, False
+    
+    part_path = file_path + ".part"
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={resume_from}-"} if resume_from else None
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
-            if response.status_code == 200:
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
-                return file_path
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 206 and resume_from:
+                mode = 'ab'
+            elif response.status_code == 200:
+                mode = 'wb'
             else:
                 print(f"PDF download HTTP error: status code {response.status_code}")
-                return None
+                if response.status_code == 416:
+                    # The partial file does not fit the remote one; start over next time
+                    await asyncio.to_thread(os.remove, part_path)
+                return None, False
+            
+            # Write the body in WRITE_BUFFER_SIZE pieces so the whole PDF is never
+            # held in memory; opening, writing and closing (which flushes) run in
+            # a worker thread to keep disk I/O off the event loop
+            f = await asyncio.to_thread(open, part_path, mode)
+            try:
+                buffer = bytearray()
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    buffer += chunk
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        data, buffer = buffer, bytearray()
+                        await asyncio.to_thread(f.write, data)
+                if buffer:
+                    await asyncio.to_thread(f.write, buffer)
+            finally:
+                await asyncio.to_thread(f.close)
+        
+        await asyncio.to_thread(os.replace, part_path, file_path)
+        return file_path, True
     except Exception as e:
+        # The ".part" file is kept so the next attempt can resume it
         print(f"PDF download error: {e}")
-        return None
+        return None, False
+
+
+async def download_pdfs(papers: List[Dict[str, Any]], papers_dir: str) -> None:
+    """
+    Download the PDFs of several papers concurrently and extract their text.
+    
+    Each paper dictionary is updated in place with "pdf_path" and
+    "full_text_available". Papers without a "pdf_url" are left without a PDF.
+    The text of newly downloaded PDFs is extracted right away, in a worker
+    thread, and stored under "full_text" so it is saved with the paper.
+    
+    At most MAX_CONCURRENT_DOWNLOADS downloads run at once, shared with any
+    other searches in progress.
+    
+    Args:
+        papers: List of paper dictionaries
+        papers_dir: Directory to save PDFs
+    """
+    async def _download(paper: Dict[str, Any]) -> Optional[str]:
+        pdf_path, written = await _download_pdf(paper["pdf_url"], paper["paper_id"], papers_dir)
+        # PDFs kept as they were had their text extracted when first downloaded.
+        # Extraction runs outside the download semaphore so parsing overlaps with other downloads
+        if written:
+            paper["full_text"] = await extract_text_from_pdf_async(pdf_path)
+        return pdf_path
+    
+    # Recently downloaded PDFs are taken as they are, so a repeated search
+    # only schedules downloads for the papers it has not seen yet
+    pdf_paths: List[Any] = [None] * len(papers)
+    pending = []
+    for i, paper in enumerate(papers):
+        if not paper.get("pdf_url"):
+            continue
+        file_path = _pdf_file_path(paper["paper_id"], papers_dir)
+        if _is_fresh_pdf(file_path):
+            pdf_paths[i] = file_path
+        else:
+            pending.append(i)
+    
+    results = await asyncio.gather(*(_download(papers[i]) for i in pending),
+                                   return_exceptions=True)
+    for i, result in zip(pending, results):
+        pdf_paths[i] = result
+    
+    for paper, pdf_path in zip(papers, pdf_paths):
+        if isinstance(pdf_path, BaseException):
+            print(f"PDF download error: {pdf_path}")
+            pdf_path = None
+        paper["pdf_path"] = pdf_path
+        paper["full_text_available"] = 1 if pdf_path else 0
 
 
 def extract_text_from_pdf(pdf_path: str, max_pages: int = 500) -> Optional[str]:
     """
     Extract full text from a PDF file.
     
+    Safe to call from several threads at once (e.g. via asyncio.to_thread);
+    the PyMuPDF work itself is serialized.
+    
     Args:
         pdf_path: Path to the PDF file
         max_pages: Maximum number of pages to process
@@ -59,26 +281,73 @@ def extract_text_from_pdf(pdf_path: str, max_pages: int = 500) -> Optional[str]:
     if not pdf_path or not os.path.exists(pdf_path):
         return None
     
-    try:
-        doc = fitz.open(pdf_path)
-        text = ""
+    with _fitz_lock:
+        return _extract_text_or_none(pdf_path, max_pages)
+
+
+async def extract_text_from_pdf_async(pdf_path: str, max_pages: int = 500) -> Optional[str]:
+    """
+    Extract full text from a PDF file without blocking the event loop.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        max_pages: Maximum number of pages to process
         
-        if len(doc) > max_pages:
-            print(f"Warning: PDF has too many pages ({len(doc)}). Processing only the first {max_pages} pages.")
-            pages = range(min(max_pages, len(doc)))
-        else:
-            pages = range(len(doc))
+    Returns:
+        Extracted text or None if extraction failed
+    """
+    return await asyncio.to_thread(extract_text_from_pdf, pdf_path, max_pages)
+
+
+async def extract_texts_from_pdfs_async(pdf_paths: List[str], max_pages: int = 500) -> List[Optional[str]]:
+    """
+    Extract full text from several PDF files without blocking the event loop.
+    
+    The files are extracted one after another in a worker thread. PyMuPDF
+    work is serialized by _fitz_lock anyway, so running them side by side
+    would not be faster; it would only tie up threads of the default pool
+    that other to_thread calls (such as database access) share.
+    
+    Args:
+        pdf_paths: Paths to the PDF files
+        max_pages: Maximum number of pages to process per file
         
-        for page_num in pages:
+    Returns:
+        Extracted texts in the order of pdf_paths, None where extraction failed
+    """
+    existing = [pdf_path for pdf_path in dict.fromkeys(pdf_paths) if pdf_path and os.path.exists(pdf_path)]
+    extracted = {}
+    for pdf_path in existing:
+        extracted[pdf_path] = await extract_text_from_pdf_async(pdf_path, max_pages)
+    return [extracted.get(pdf_path) for pdf_path in pdf_paths]
+
+
+def _extract_text_or_none(pdf_path: str, max_pages: int) -> Optional[str]:
+    """Run _extract_text, reporting errors instead of raising them."""
+    try:
+        return _extract_text(pdf_path, max_pages)
+    except Exception as e:
+        print(f"PDF text extraction error: {e}")
+        return None
+
+
+def _extract_text(pdf_path: str, max_pages: int) -> str:
+    """Extract the text of up to max_pages pages; the caller holds _fitz_lock."""
+    doc = fitz.open(pdf_path)
+    try:
+        page_count = len(doc)
+        if page_count > max_pages:
+            print(f"Warning: PDF has too many pages ({page_count}). Processing only the first {max_pages} pages.")
+            page_count = max_pages
+        
+        texts = []
+        for page_num in range(page_count):
             try:
-                page = doc[page_num]
-                text += page.get_text()
+                texts.append(doc[page_num].get_text("text", flags=TEXT_FLAGS))
             except Exception as e:
                 print(f"Text extraction error on page {page_num}: {e}")
                 continue
         
+        return "".join(texts)
+    finally:
         doc.close()
-        return text
-    except Exception as e:
-        print(f"PDF text extraction error: {e}")
-        return None
@@ -4,38 +4,76 @@ Model Context Protocol (MCP) ツール関数を定義するモジュール。
 """
 from typing import Any, List, Dict, Optional
 import os
+import csv
 import json
-import pandas as pd
 import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from mcp.server.fastmcp import FastMCP
 from datetime import datetime
 from pathlib import Path
 
+try:
+    # orjson がインストールされていれば高速なJSONシリアライズに使用する (pip install "paper-collector[fast-json]")
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # pyarrow がインストールされていれば Parquet 形式でのエクスポートに使用する (pip install "paper-collector[parquet]")
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 try:
     # インストールされたパッケージとして実行する場合
     from paper_collector.db.database import PaperDatabase
-    from paper_collector.pdf.pdf_handler import extract_text_from_pdf
+    from paper_collector.pdf.pdf_handler import (
+        download_pdfs, extract_text_from_pdf_async, extract_texts_from_pdfs_async, set_max_concurrent_downloads
+    )
     from paper_collector.api.arxiv_client import ArxivClient
     from paper_collector.api.semantic_scholar_client import SemanticScholarClient
     from paper_collector.utils.file_utils import ensure_directory_exists
+    from paper_collector.utils.dedup import deduplicate_papers
     from paper_collector.utils.config import config
+    from paper_collector.utils.http_client import close_client
+    from paper_collector.utils.rate_limit import RateLimiter
 except ImportError:
     # 開発環境で直接実行する場合（相対インポート）
     from ..db.database import PaperDatabase
-    from ..pdf.pdf_handler import extract_text_from_pdf
+    from ..pdf.pdf_handler import (
+        download_pdfs, extract_text_from_pdf_async, extract_texts_from_pdfs_async, set_max_concurrent_downloads
+    )
     from ..api.arxiv_client import ArxivClient
     from ..api.semantic_scholar_client import SemanticScholarClient
     from ..utils.file_utils import ensure_directory_exists
+    from ..utils.dedup import deduplicate_papers
     from ..utils.config import config
+    from ..utils.http_client import close_client
+    from ..utils.rate_limit import RateLimiter
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """サーバー終了時に共有HTTPクライアントとデータベース接続を閉じます"""
+    try:
+        yield
+    finally:
+        await close_client()
+        paper_db.close()
 
 # MCPサーバーの初期化
-mcp = FastMCP("paper-collector")
+mcp = FastMCP("paper-collector", lifespan=_lifespan)
 
 # 設定からパスとパラメータを取得
 DATA_DIR = config.get_data_dir()
 PAPERS_DIR = config.get_papers_dir()
 DB_PATH = config.get_db_path()
 API_DELAY = config.get("api_delay", 1.0)
+MAX_CONCURRENT_DOWNLOADS = config.get("max_concurrent_downloads", 5)
+# エクスポートの書き込みバッファ（全文を含む大きなファイルでも書き込み回数を抑える）
+EXPORT_BUFFER_SIZE = 1024 * 1024
 
 # ディレクトリの存在を確認
 ensure_directory_exists(DATA_DIR)
@@ -43,8 +81,19 @@ ensure_directory_exists(PAPERS_DIR)
 
 # クライアントの初期化
 paper_db = PaperDatabase(DB_PATH)
-arxiv_client = ArxivClient(PAPERS_DIR, API_DELAY)
-semantic_scholar_client = SemanticScholarClient(PAPERS_DIR, API_DELAY)
+# 両クライアントのSemantic Scholarへのリクエストは同じレート制限を共有する
+semantic_scholar_limiter = RateLimiter(1, API_DELAY)
+arxiv_client = ArxivClient(PAPERS_DIR, API_DELAY, citation_cache=paper_db,
+                           rate_limiter=semantic_scholar_limiter, response_cache=paper_db)
+semantic_scholar_client = SemanticScholarClient(PAPERS_DIR, API_DELAY, response_cache=paper_db,
+                                                rate_limiter=semantic_scholar_limiter)
+set_max_concurrent_downloads(MAX_CONCURRENT_DOWNLOADS)
+
+def _dumps_json(obj: Any) -> str:
+    """オブジェクトを json.dumps(obj, ensure_ascii=False, indent=2) と同じ形式のJSON文字列にします"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
 
 # ログユーティリティ
 def log_info(message: str) -> None:
@@ -97,27 +146,38 @@ async def search_papers(query: str, source: str = "both", limit: int = 5) -> str
     """
     try:
         papers = []
+        searches = []
         
         if source.lower() in ["arxiv", "both"]:
             log_info(f"ArXivで検索: {query}")
-            arxiv_papers = await arxiv_client.search(query, limit)
-            papers.extend(arxiv_papers)
+            searches.append(arxiv_client.search(query, limit, download=False))
             
         if source.lower() in ["semantic_scholar", "both"]:
             log_info(f"Semantic Scholarで検索: {query}")
-            semantic_papers = await semantic_scholar_client.search(query, limit)
-            papers.extend(semantic_papers)
+            searches.append(semantic_scholar_client.search(query, limit, download=False))
+        
+        # 各ソースの検索を並行して実行
+        for result in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(result, Exception):
+                log_error(f"論文検索中にエラーが発生しました: {result}")
+                continue
+            papers.extend(result)
+        
+        # 両ソースに含まれる同じ論文を除外してから、残った論文のPDFだけをダウンロード
+        papers = deduplicate_papers(papers)
+        await download_pdfs(papers, PAPERS_DIR)
         
-        saved_count = paper_db.save_papers(papers)
+        new_ids = await asyncio.to_thread(paper_db.save_papers_with_new_ids, papers)
+        saved_count = len(new_ids)
         
-        summary = f"検索キーワード「{query}」で{len(papers)}件の論文が見つかりました。\n"
-        summary += f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n"
+        parts = [f"検索キーワード「{query}」で{len(papers)}件の論文が見つかりました。\n"]
+        parts.append(f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n")
         
         full_text_count = sum(1 for paper in papers if paper.get("full_text_available", 0) == 1)
-        summary += f"全文が利用可能な論文: {full_text_count}件\n\n"
+        parts.append(f"全文が利用可能な論文: {full_text_count}件\n\n")
         
         if saved_count > 0:
-            summary += "新規追加された論文:\n"
+            parts.append("新規追加された論文:\n")
             seen_ids = set()
             
             for paper in papers:
@@ -125,12 +185,11 @@ async def search_papers(query: str, source: str = "both", limit: int = 5) -> str
                 if paper_id not in seen_ids:
                     seen_ids.add(paper_id)
                     
-                    db_paper = paper_db.get_paper_by_id(paper_id)
-                    if db_paper and db_paper["collected_date"] == datetime.now().strftime("%Y-%m-%d"):
+                    if paper_id in new_ids:
                         full_text = "（全文あり）" if paper.get("full_text_available", 0) == 1 else ""
-                        summary += f"- {paper['title']} ({paper['source']}) {full_text}\n"
+                        parts.append(f"- {paper['title']} ({paper['source']}) {full_text}\n")
         
-        return summary
+        return "".join(parts)
     except Exception as e:
         log_error(f"論文検索中にエラーが発生しました: {e}")
         return f"論文検索中にエラーが発生しました: {e}"
@@ -184,41 +243,53 @@ async def search_papers_by_citations(
     """
     try:
         papers = []
+        searches = []
         
         if source.lower() in ["arxiv", "both"]:
             log_info(f"ArXivで引用数検索: {query} (最小引用数: {min_citations})")
-            arxiv_papers = await arxiv_client.search(query, limit, min_citations, sort_by)
-            papers.extend(arxiv_papers)
+            searches.append(arxiv_client.search(query, limit, min_citations, sort_by, download=False))
             
         if source.lower() in ["semantic_scholar", "both"]:
             log_info(f"Semantic Scholarで引用数検索: {query} (最小引用数: {min_citations})")
-            semantic_papers = await semantic_scholar_client.search(query, limit, min_citations, sort_by)
-            papers.extend(semantic_papers)
+            searches.append(semantic_scholar_client.search(query, limit, min_citations, sort_by,
+                                                           download=False))
+        
+        # 各ソースの検索を並行して実行
+        for result in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(result, Exception):
+                log_error(f"引用数による論文検索中にエラーが発生しました: {result}")
+                continue
+            papers.extend(result)
+        
+        papers = deduplicate_papers(papers)
         
         if sort_by == "citations":
             papers.sort(key=lambda x: x.get("citation_count", 0), reverse=True)
             papers = papers[:limit]
         
-        saved_count = paper_db.save_papers(papers)
+        # 重複除去と件数の絞り込みの後で、残った論文のPDFだけをダウンロード
+        await download_pdfs(papers, PAPERS_DIR)
+        
+        saved_count = await asyncio.to_thread(paper_db.save_papers, papers)
         
-        summary = f"検索キーワード「{query}」で最小引用数 {min_citations} 以上の論文が {len(papers)}件見つかりました。\n"
-        summary += f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n"
+        parts = [f"検索キーワード「{query}」で最小引用数 {min_citations} 以上の論文が {len(papers)}件見つかりました。\n"]
+        parts.append(f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n")
         
         if papers:
-            summary += "検索結果:\n"
+            parts.append("検索結果:\n")
             for i, paper in enumerate(papers, 1):
                 full_text = "（全文あり）" if paper.get("full_text_available", 0) == 1 else ""
-                summary += f"{i}. {paper['title']} ({paper['source']})\n"
-                summary += f"   著者: {paper['authors']}\n"
-                summary += f"   引用数: {paper.get('citation_count', 0)}\n"
+                parts.append(f"{i}. {paper['title']} ({paper['source']})\n")
+                parts.append(f"   著者: {paper['authors']}\n")
+                parts.append(f"   引用数: {paper.get('citation_count', 0)}\n")
                 if paper.get("venue"):
-                    summary += f"   掲載先: {paper.get('venue')}\n"
-                summary += f"   URL: {paper['url']}\n"
-                summary += f"   {full_text}\n\n"
+                    parts.append(f"   掲載先: {paper.get('venue')}\n")
+                parts.append(f"   URL: {paper['url']}\n")
+                parts.append(f"   {full_text}\n\n")
         else:
-            summary += "指定された条件に合致する論文は見つかりませんでした。"
+            parts.append("指定された条件に合致する論文は見つかりませんでした。")
         
-        return summary
+        return "".join(parts)
     except Exception as e:
         log_error(f"引用数による論文検索中にエラーが発生しました: {e}")
         return f"引用数による論文検索中にエラーが発生しました: {e}"
@@ -283,7 +354,8 @@ async def list_saved_papers(
         log_info(f"保存された論文を一覧表示します。キーワード: '{keyword}', ソート: {sort_by} {sort_order}")
         
         # Get papers based on search criteria
-        papers = paper_db.get_papers(
+        papers = await asyncio.to_thread(
+            paper_db.get_papers,
             keyword, source, limit, sort_by, sort_order,
             filter_has_fulltext, min_citations, venue, date_from, date_to
         )
@@ -330,10 +402,10 @@ def _format_papers_as_csv(papers: List[Dict[str, Any]]) -> str:
     Returns:
         CSV形式にフォーマットされた論文データ
     """
-    result = "paper_id,title,authors,source,url,citation_count,venue,published_date,collected_date,full_text_available\n"
+    parts = ["paper_id,title,authors,source,url,citation_count,venue,published_date,collected_date,full_text_available\n"]
     for paper in papers:
-        result += f'"{paper["paper_id"]}","{paper["title"].replace("\"", "\"\"")}","{paper["authors"].replace("\"", "\"\"")}","{paper["source"]}","{paper["url"]}","{paper["citation_count"]}","{paper.get("venue", "").replace("\"", "\"\"")}","{paper["published_date"]}","{paper["collected_date"]}","{paper["full_text_available"]}"\n'
-    return result
+        parts.append(f'"{paper["paper_id"]}","{paper["title"].replace("\"", "\"\"")}","{paper["authors"].replace("\"", "\"\"")}","{paper["source"]}","{paper["url"]}","{paper["citation_count"]}","{paper.get("venue", "").replace("\"", "\"\"")}","{paper["published_date"]}","{paper["collected_date"]}","{paper["full_text_available"]}"\n')
+    return "".join(parts)
 
 def _format_papers_as_compact(papers: List[Dict[str, Any]]) -> str:
     """
@@ -358,15 +430,15 @@ def _format_papers_as_compact(papers: List[Dict[str, Any]]) -> str:
     Returns:
         コンパクト形式にフォーマットされた論文リスト
     """
-    result = f"合計 {len(papers)} 件の論文:\n\n"
+    parts = [f"合計 {len(papers)} 件の論文:\n\n"]
     for i, paper in enumerate(papers, 1):
         full_text = "📄" if paper["full_text_available"] else ""
         citations = f"[引用:{paper['citation_count']}]" if paper['citation_count'] > 0 else ""
-        result += f"{i}. {paper['title']} {full_text} {citations}\n"
-        result += f"   著者: {paper['authors'][:50]}{'...' if len(paper['authors']) > 50 else ''}\n"
-        result += f"   発表: {paper['published_date']} | 収集: {paper['collected_date']}\n"
-        result += f"   ソース: {paper['source']}\n\n"
-    return result
+        parts.append(f"{i}. {paper['title']} {full_text} {citations}\n")
+        parts.append(f"   著者: {paper['authors'][:50]}{'...' if len(paper['authors']) > 50 else ''}\n")
+        parts.append(f"   発表: {paper['published_date']} | 収集: {paper['collected_date']}\n")
+        parts.append(f"   ソース: {paper['source']}\n\n")
+    return "".join(parts)
 
 def _format_papers_as_detailed(papers: List[Dict[str, Any]]) -> str:
     """
@@ -395,35 +467,35 @@ def _format_papers_as_detailed(papers: List[Dict[str, Any]]) -> str:
     Returns:
         詳細形式にフォーマットされた論文リスト
     """
-    result = f"合計 {len(papers)} 件の論文:\n\n"
+    parts = [f"合計 {len(papers)} 件の論文:\n\n"]
     
     for paper in papers:
         full_text = "（全文あり）" if paper["full_text_available"] else ""
-        result += f"タイトル: {paper['title']} {full_text}\n"
-        result += f"著者: {paper['authors']}\n"
-        result += f"ソース: {paper['source']}\n"
-        result += f"URL: {paper['url']}\n"
+        parts.append(f"タイトル: {paper['title']} {full_text}\n")
+        parts.append(f"著者: {paper['authors']}\n")
+        parts.append(f"ソース: {paper['source']}\n")
+        parts.append(f"URL: {paper['url']}\n")
         
         if paper["citation_count"] > 0:
-            result += f"引用数: {paper['citation_count']}\n"
+            parts.append(f"引用数: {paper['citation_count']}\n")
         
         if paper.get("venue"):
-            result += f"掲載先: {paper['venue']}\n"
+            parts.append(f"掲載先: {paper['venue']}\n")
         
         # 発表日を追加
         if paper.get("published_date"):
-            result += f"発表日: {paper['published_date']}\n"
+            parts.append(f"発表日: {paper['published_date']}\n")
         
         # 概要は長すぎる場合は切り詰め
         if paper.get("abstract"):
             abstract_preview = paper["abstract"][:200].replace("\n", " ")
-            result += f"概要: {abstract_preview}{'...' if len(paper['abstract']) > 200 else ''}\n"
+            parts.append(f"概要: {abstract_preview}{'...' if len(paper['abstract']) > 200 else ''}\n")
         
-        result += f"収集日: {paper['collected_date']}\n"
-        result += f"ID: {paper['paper_id']}\n"
-        result += "-" * 50 + "\n"
+        parts.append(f"収集日: {paper['collected_date']}\n")
+        parts.append(f"ID: {paper['paper_id']}\n")
+        parts.append("-" * 50 + "\n")
         
-    return result
+    return "".join(parts)
 
 @mcp.tool()
 async def rank_papers_by_citations(keyword: str = "", limit: int = 10) -> str:
@@ -454,7 +526,8 @@ async def rank_papers_by_citations(keyword: str = "", limit: int = 10) -> str:
     """
     try:
         log_info(f"論文の引用数ランキングを表示します。キーワード: '{keyword}'")
-        papers = paper_db.get_papers(
+        papers = await asyncio.to_thread(
+            paper_db.get_papers,
             keyword=keyword,
             limit=limit,
             sort_by="citations",
@@ -464,20 +537,20 @@ async def rank_papers_by_citations(keyword: str = "", limit: int = 10) -> str:
         if not papers:
             return "指定された条件に合致する論文は見つかりませんでした。"
         
-        result = f"引用数ランキング（{keyword if keyword else '全て'}）:\n\n"
+        parts = [f"引用数ランキング（{keyword if keyword else '全て'}）:\n\n"]
         
         for i, paper in enumerate(papers, 1):
-            result += f"{i}. {paper['title']}\n"
-            result += f"   著者: {paper['authors']}\n"
-            result += f"   引用数: {paper['citation_count']}\n"
+            parts.append(f"{i}. {paper['title']}\n")
+            parts.append(f"   著者: {paper['authors']}\n")
+            parts.append(f"   引用数: {paper['citation_count']}\n")
             if paper['venue']:
-                result += f"   掲載先: {paper['venue']}\n"
-            result += f"   ソース: {paper['source']}\n"
-            result += f"   URL: {paper['url']}\n"
-            result += f"   収集日: {paper['collected_date']}\n"
-            result += "-" * 50 + "\n"
+                parts.append(f"   掲載先: {paper['venue']}\n")
+            parts.append(f"   ソース: {paper['source']}\n")
+            parts.append(f"   URL: {paper['url']}\n")
+            parts.append(f"   収集日: {paper['collected_date']}\n")
+            parts.append("-" * 50 + "\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         log_error(f"引用数ランキング表示中にエラーが発生しました: {e}")
         return f"引用数ランキング表示中にエラーが発生しました: {e}"
@@ -511,7 +584,7 @@ async def list_papers_by_venue(venue: str = "", limit: int = 10) -> str:
     """
     try:
         log_info(f"掲載先での論文検索: '{venue}'")
-        papers = paper_db.get_papers_by_venue(venue, limit)
+        papers = await asyncio.to_thread(paper_db.get_papers_by_venue, venue, limit)
         
         if not papers:
             return "指定された掲載先の論文は見つかりませんでした。"
@@ -523,18 +596,18 @@ async def list_papers_by_venue(venue: str = "", limit: int = 10) -> str:
                 venues[v] = []
             venues[v].append(paper)
         
-        result = f"掲載先別論文一覧（{venue if venue else '全て'}）:\n\n"
+        parts = [f"掲載先別論文一覧（{venue if venue else '全て'}）:\n\n"]
         
         for v, v_papers in venues.items():
-            result += f"【{v}】- {len(v_papers)}件\n"
+            parts.append(f"【{v}】- {len(v_papers)}件\n")
             for paper in v_papers:
-                result += f"- {paper['title']}\n"
-                result += f"  著者: {paper['authors']}\n"
-                result += f"  引用数: {paper['citation_count']}\n"
-                result += f"  URL: {paper['url']}\n"
-            result += "-" * 50 + "\n"
+                parts.append(f"- {paper['title']}\n")
+                parts.append(f"  著者: {paper['authors']}\n")
+                parts.append(f"  引用数: {paper['citation_count']}\n")
+                parts.append(f"  URL: {paper['url']}\n")
+            parts.append("-" * 50 + "\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         log_error(f"掲載先別論文一覧表示中にエラーが発生しました: {e}")
         return f"掲載先別論文一覧表示中にエラーが発生しました: {e}"
@@ -569,21 +642,21 @@ async def list_top_venues(limit: int = 10) -> str:
     """
     try:
         log_info(f"トップ掲載先一覧を表示します。上位 {limit} 件")
-        venues = paper_db.get_top_venues(limit)
+        venues = await asyncio.to_thread(paper_db.get_top_venues, limit)
         
         if not venues:
             return "掲載先情報がある論文がありません。"
         
-        result = "トップ掲載先一覧（平均引用数順）:\n\n"
+        parts = ["トップ掲載先一覧（平均引用数順）:\n\n"]
         
         for i, (venue, paper_count, avg_citations, max_citations) in enumerate(venues, 1):
-            result += f"{i}. {venue}\n"
-            result += f"   論文数: {paper_count}件\n"
-            result += f"   平均引用数: {avg_citations:.1f}\n"
-            result += f"   最大引用数: {max_citations}\n"
-            result += "-" * 50 + "\n"
+            parts.append(f"{i}. {venue}\n")
+            parts.append(f"   論文数: {paper_count}件\n")
+            parts.append(f"   平均引用数: {avg_citations:.1f}\n")
+            parts.append(f"   最大引用数: {max_citations}\n")
+            parts.append("-" * 50 + "\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         log_error(f"トップ掲載先一覧表示中にエラーが発生しました: {e}")
         return f"トップ掲載先一覧表示中にエラーが発生しました: {e}"
@@ -618,34 +691,34 @@ async def get_paper_details(paper_id: str) -> str:
     """
     try:
         log_info(f"論文詳細を検索: '{paper_id}'")
-        paper = paper_db.get_paper_by_id(paper_id)
+        paper = await asyncio.to_thread(paper_db.get_paper_by_id, paper_id, include_full_text=False)
         
         if not paper:
             return f"ID または タイトル '{paper_id}' の論文は見つかりませんでした。"
         
         full_text = "（全文あり）" if paper["full_text_available"] else "（全文なし）"
-        result = f"タイトル: {paper['title']} {full_text}\n"
-        result += f"著者: {paper['authors']}\n"
-        result += f"出版年: {paper['published_date']}\n"
-        result += f"ソース: {paper['source']}\n"
-        result += f"URL: {paper['url']}\n"
+        parts = [f"タイトル: {paper['title']} {full_text}\n"]
+        parts.append(f"著者: {paper['authors']}\n")
+        parts.append(f"出版年: {paper['published_date']}\n")
+        parts.append(f"ソース: {paper['source']}\n")
+        parts.append(f"URL: {paper['url']}\n")
         
         if paper["citation_count"] > 0:
-            result += f"引用数: {paper['citation_count']}\n"
+            parts.append(f"引用数: {paper['citation_count']}\n")
         
         if paper["venue"]:
-            result += f"掲載先: {paper['venue']}\n"
+            parts.append(f"掲載先: {paper['venue']}\n")
         
         if paper["full_text_available"] and paper["pdf_path"]:
-            result += f"PDF: {paper['pdf_path']}\n"
+            parts.append(f"PDF: {paper['pdf_path']}\n")
         
-        result += f"収集日: {paper['collected_date']}\n"
-        result += f"\n概要:\n{paper['abstract']}\n"
+        parts.append(f"収集日: {paper['collected_date']}\n")
+        parts.append(f"\n概要:\n{paper['abstract']}\n")
         
         if paper['keywords']:
-            result += f"\nキーワード: {paper['keywords']}\n"
+            parts.append(f"\nキーワード: {paper['keywords']}\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         log_error(f"論文詳細表示中にエラーが発生しました: {e}")
         return f"論文詳細表示中にエラーが発生しました: {e}"
@@ -687,7 +760,7 @@ async def get_paper_full_text(paper_id: str, max_length: int = 1000000) -> str:
     """
     try:
         log_info(f"論文全文を取得: '{paper_id}'")
-        paper = paper_db.get_paper_by_id(paper_id)
+        paper = await asyncio.to_thread(paper_db.get_paper_by_id, paper_id, include_full_text=False)
         
         if not paper:
             return f"ID または タイトル '{paper_id}' の論文は見つかりませんでした。"
@@ -695,25 +768,42 @@ async def get_paper_full_text(paper_id: str, max_length: int = 1000000) -> str:
         if not paper["full_text_available"] or not paper["pdf_path"]:
             return f"論文 '{paper['title']}' のPDFファイルが見つかりませんでした。"
         
-        full_text = paper["full_text"] if paper["full_text"] is not None else None
+        full_text = await _ensure_full_text(paper)
         
         if not full_text:
-            log_info(f"PDFからテキストを抽出: {paper['pdf_path']}")
-            full_text = extract_text_from_pdf(paper["pdf_path"])
-            
-            if full_text:
-                paper_db.save_full_text(paper["paper_id"], full_text)
-            else:
-                return f"論文 '{paper['title']}' のPDFからテキストを抽出できませんでした。"
+            return f"論文 '{paper['title']}' のPDFからテキストを抽出できませんでした。"
     
-        if len(full_text) > max_length:
-            full_text = full_text[:max_length] + f"\n\n... (テキストが長いため切り詰められました。全文は {len(full_text)} 文字あります)"
+        text_length = len(full_text)
+        if text_length > max_length:
+            full_text = f"{full_text[:max_length]}\n\n... (テキストが長いため切り詰められました。全文は {text_length} 文字あります)"
     
         return f"タイトル: {paper['title']}\n著者: {paper['authors']}\n\n全文:\n{full_text}"
     except Exception as e:
         log_error(f"論文全文取得中にエラーが発生しました: {e}")
         return f"論文全文取得中にエラーが発生しました: {e}"
 
+async def _ensure_full_text(paper: Dict[str, Any]) -> Optional[str]:
+    """
+    論文の全文を取得します。まだ抽出されていない場合はPDFから抽出して保存します
+
+    保存済みの全文は search_full_text と共有するメモリ上のキャッシュから読み込まれます。
+
+    Args:
+        paper: paper_id と pdf_path を含む論文の辞書
+
+    Returns:
+        論文の全文。抽出できなかった場合は None
+    """
+    full_text = await asyncio.to_thread(paper_db.get_full_text, paper["paper_id"])
+    if full_text or not paper["pdf_path"]:
+        return full_text
+    
+    log_info(f"PDFからテキストを抽出: {paper['pdf_path']}")
+    full_text = await extract_text_from_pdf_async(paper["pdf_path"])
+    if full_text:
+        await asyncio.to_thread(paper_db.save_full_text, paper["paper_id"], full_text)
+    return full_text
+
 @mcp.tool()
 async def search_full_text(query: str, limit: int = 5) -> str:
     """
@@ -726,7 +816,8 @@ async def search_full_text(query: str, limit: int = 5) -> str:
     
     ローカル全文検索の特徴と活用法:
     - PDFが保存されている論文のみが検索対象となります
-    - 初回検索時にPDFからテキストを抽出し、データベースに保存するため高速に検索できます
+    - PDFのテキストはダウンロード時に抽出されてデータベースに保存されるため高速に検索できます
+    - 全文はSQLiteの全文インデックス（FTS5）で検索されるため、論文数が増えても高速です
     - 数式や図表の記述を探したり、特定の手法について詳しく書かれている論文を見つけられます
     - 単語だけでなく、フレーズや複数単語を組み合わせた検索も可能です
     - 大文字小文字は区別されないため、"BERT"も"Bert"も"bert"も同じ結果になります
@@ -769,53 +860,33 @@ async def search_full_text(query: str, limit: int = 5) -> str:
     """
     try:
         log_info(f"論文全文を検索: '{query}'")
-        papers = paper_db.get_papers(filter_has_fulltext=True, limit=100)  # より多くの論文を取得して検索
         
-        if not papers:
-            return "全文が利用可能な論文がありません。"
+        # ダウンロード時に抽出されていない論文（以前に保存された論文など）はここで抽出してインデックスに登録
+        # 抽出はCPU負荷が高いため、イベントループを塞がないようワーカースレッドで1件ずつ実行する
+        pending = await asyncio.to_thread(paper_db.get_papers_without_full_text, limit=100)
+        texts = await extract_texts_from_pdfs_async([paper["pdf_path"] for paper in pending])
+        await asyncio.to_thread(paper_db.save_full_texts,
+                                [(paper["paper_id"], full_text) for paper, full_text in zip(pending, texts)])
+        # PDFが見つからない・読めない・テキストが空だった論文は、次回の検索で再び抽出しないよう記録する
+        await asyncio.to_thread(paper_db.mark_full_text_unavailable,
+                                [paper["paper_id"] for paper, full_text in zip(pending, texts) if not full_text])
         
-        results = []
-        
-        for paper in papers:
-            full_text = paper["full_text"] if paper["full_text"] is not None else None
-            if not full_text and paper["pdf_path"]:
-                full_text = extract_text_from_pdf(paper["pdf_path"])
-                if full_text:
-                    paper_db.save_full_text(paper["paper_id"], full_text)
-            
-            if full_text and query.lower() in full_text.lower():
-                index = full_text.lower().find(query.lower())
-                start = max(0, index - 100)
-                end = min(len(full_text), index + len(query) + 100)
-                
-                context = full_text[start:end].replace("\n", " ")
-                if start > 0:
-                    context = "..." + context
-                if end < len(full_text):
-                    context = context + "..."
-                
-                results.append({
-                    "paper_id": paper["paper_id"],
-                    "title": paper["title"],
-                    "authors": paper["authors"],
-                    "context": context
-                })
-                
-                if len(results) >= limit:
-                    break
+        results = await asyncio.to_thread(paper_db.search_full_text, query, limit)
         
         if not results:
+            if await asyncio.to_thread(paper_db.count_full_text_papers) == 0:
+                return "全文が利用可能な論文がありません。"
             return f"キーワード '{query}' を含む論文は見つかりませんでした。"
         
-        result_text = f"キーワード '{query}' を含む論文: {len(results)}件\n\n"
+        parts = [f"キーワード '{query}' を含む論文: {len(results)}件\n\n"]
         
         for i, res in enumerate(results, 1):
-            result_text += f"{i}. タイトル: {res['title']}\n"
-            result_text += f"   著者: {res['authors']}\n"
-            result_text += f"   コンテキスト: {res['context']}\n"
-            result_text += f"   (Paper ID: {res['paper_id']})\n\n"
+            parts.append(f"{i}. タイトル: {res['title']}\n")
+            parts.append(f"   著者: {res['authors']}\n")
+            parts.append(f"   コンテキスト: {res['context']}\n")
+            parts.append(f"   (Paper ID: {res['paper_id']})\n\n")
         
-        return result_text
+        return "".join(parts)
     except Exception as e:
         log_error(f"全文検索中にエラーが発生しました: {e}")
         return f"全文検索中にエラーが発生しました: {e}"
@@ -835,9 +906,12 @@ async def export_summaries(format: str = "json") -> str:
     - ファイル名には自動的に日時が付加されます (例: paper_summaries_20250406_123045.json)
     - JSON形式はデータの完全性を保持し、プログラムでの再利用に最適です
     - CSV形式は表計算ソフトなどでの閲覧・分析に適しています
+    - Parquet形式は圧縮された列指向のバイナリ形式で、pandasなどでの大量データの分析に適しています
+      （pyarrowが必要です。parquet extra でインストールできます: pip install "paper-collector[parquet]"）
+    - fast-json extra (orjson) がインストールされていれば、JSON形式の書き出しが高速になります
     
     Args:
-        format: エクスポート形式 ("json"=JSON形式, "csv"=CSV形式)
+        format: エクスポート形式 ("json"=JSON形式, "csv"=CSV形式, "parquet"=Parquet形式)
     
     Returns:
         エクスポート結果の報告（保存先ファイルパスを含む）
@@ -845,30 +919,93 @@ async def export_summaries(format: str = "json") -> str:
     例:
         * export_summaries() - JSONフォーマットでエクスポート
         * export_summaries("csv") - CSVフォーマットでエクスポート
+        * export_summaries("parquet") - Parquetフォーマットでエクスポート
     """
     try:
         log_info(f"論文要約をエクスポート: 形式 = {format}")
-        papers = paper_db.get_papers(limit=1000)  # 最大1000件の論文をエクスポート
+        if format.lower() == "parquet" and pyarrow is None:
+            return "Parquet形式でのエクスポートには pyarrow が必要です。pip install 'paper-collector[parquet]' でインストールしてください。"
         
-        if not papers:
-            return "データベースに論文がありません。"
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # 読み込みと書き出しはイベントループを止めないようスレッドで実行する
+        export_path = await asyncio.to_thread(_write_summaries, format)
         
-        if format.lower() == "json":
-            export_path = os.path.join(DATA_DIR, f"paper_summaries_{timestamp}.json")
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(papers, f, ensure_ascii=False, indent=2)
-        else:
-            export_path = os.path.join(DATA_DIR, f"paper_summaries_{timestamp}.csv")
-            df = pd.DataFrame(papers)
-            df.to_csv(export_path, index=False)
+        if export_path is None:
+            return "データベースに論文がありません。"
         
         return f"論文要約を {export_path} にエクスポートしました。"
     except Exception as e:
         log_error(f"要約エクスポート中にエラーが発生しました: {e}")
         return f"要約エクスポート中にエラーが発生しました: {e}"
 
+def _write_summaries(format: str) -> Optional[str]:
+    """
+    保存済みの論文をファイルにエクスポートします（export_summaries の同期処理部分）
+
+    Args:
+        format: エクスポート形式 ("json"、"csv" または "parquet")
+
+    Returns:
+        エクスポートしたファイルのパス。論文がない場合は None
+    """
+    # 最大1000件の論文を100件ずつ読み込み、ファイルへ順に書き出す
+    chunks = paper_db.iter_papers(limit=1000, chunk_size=100)
+    first_chunk = next(chunks, None)
+    
+    if not first_chunk:
+        return None
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    if format.lower() == "json":
+        export_path = os.path.join(DATA_DIR, f"paper_summaries_{timestamp}.json")
+        with open(export_path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            separator = "[\n"
+            for chunk in itertools.chain([first_chunk], chunks):
+                for paper in chunk:
+                    # json.dump(papers, indent=2) と同じ形式になるよう各論文を字下げして出力
+                    paper_json = _dumps_json(paper)
+                    f.write(separator + "  " + paper_json.replace("\n", "\n  "))
+                    separator = ",\n"
+            f.write("\n]")
+    elif format.lower() == "parquet":
+        export_path = os.path.join(DATA_DIR, f"paper_summaries_{timestamp}.parquet")
+        schema = _parquet_schema(list(first_chunk[0].keys()))
+        writer = pyarrow.parquet.ParquetWriter(export_path, schema, compression="zstd")
+        try:
+            for chunk in itertools.chain([first_chunk], chunks):
+                writer.write_table(pyarrow.Table.from_pylist(chunk, schema=schema))
+        finally:
+            writer.close()
+    else:
+        export_path = os.path.join(DATA_DIR, f"paper_summaries_{timestamp}.csv")
+        with open(export_path, 'w', encoding='utf-8', newline='', buffering=EXPORT_BUFFER_SIZE) as f:
+            writer = csv.writer(f, lineterminator="\n")
+            columns = list(first_chunk[0].keys())
+            writer.writerow(columns)
+            for chunk in itertools.chain([first_chunk], chunks):
+                writer.writerows([paper[column] for column in columns] for paper in chunk)
+    
+    return export_path
+
+def _parquet_schema(columns: List[str]) -> "pyarrow.Schema":
+    """
+    papers テーブルの列に対応する Parquet のスキーマを作成します
+
+    チャンクごとの型推論に任せると、値がすべて NULL のチャンクで型が変わってしまうため固定する
+
+    Args:
+        columns: 列名のリスト
+
+    Returns:
+        数値の列以外を文字列型としたスキーマ
+    """
+    numeric_types = {
+        "full_text_available": pyarrow.int64(),
+        "citation_count": pyarrow.int64(),
+        "venue_impact_score": pyarrow.float64(),
+    }
+    return pyarrow.schema([(column, numeric_types.get(column, pyarrow.string())) for column in columns])
+
 @mcp.tool()
 async def search_papers_by_date_range(
     query: str,
@@ -930,39 +1067,54 @@ async def search_papers_by_date_range(
         
         log_info(f"日付範囲で論文検索: '{query}', 期間 = {start_date}～{end_date}")
         papers = []
+        searches = []
+        
+        async def search_semantic_scholar() -> List[Dict[str, Any]]:
+            # Semantic Scholarは年単位でしか絞り込めないため、日付で絞り込み直す
+            semantic_papers = await semantic_scholar_client.search_by_date(
+                query, start_datetime.year, end_datetime.year, limit, download=False)
+            return semantic_scholar_client.filter_papers_by_date(
+                semantic_papers, start_datetime, end_datetime)
         
         # 論文を検索
         if source.lower() in ["arxiv", "both"]:
-            arxiv_papers = await arxiv_client.search_by_date(query, arxiv_start, arxiv_end, limit)
-            papers.extend(arxiv_papers)
+            searches.append(arxiv_client.search_by_date(query, arxiv_start, arxiv_end, limit,
+                                                        download=False))
             
         if source.lower() in ["semantic_scholar", "both"]:
-            semantic_papers = await semantic_scholar_client.search_by_date(
-                query, start_datetime.year, end_datetime.year, limit)
-            semantic_papers = semantic_scholar_client.filter_papers_by_date(
-                semantic_papers, start_datetime, end_datetime)
-            papers.extend(semantic_papers)
+            searches.append(search_semantic_scholar())
+        
+        # 各ソースの検索を並行して実行
+        for result in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(result, Exception):
+                log_error(f"日付範囲での論文検索中にエラーが発生しました: {result}")
+                continue
+            papers.extend(result)
         
         if not papers:
             return f"検索キーワード「{query}」で日付範囲 {start_date} から {end_date} の間に発表された論文は見つかりませんでした。"
         
-        saved_count = paper_db.save_papers(papers)
+        # 日付での絞り込みと重複除去の後で、残った論文のPDFだけをダウンロード
+        papers = deduplicate_papers(papers)
+        await download_pdfs(papers, PAPERS_DIR)
+        
+        saved_count = await asyncio.to_thread(paper_db.save_papers, papers)
         
-        summary = f"検索キーワード「{query}」で日付範囲 {start_date} から {end_date} の間に発表された論文が {len(papers)}件見つかりました。\n"
-        summary += f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n"
+        parts = [f"検索キーワード「{query}」で日付範囲 {start_date} から {end_date} の間に発表された論文が {len(papers)}件見つかりました。\n"]
+        parts.append(f"そのうち{saved_count}件が新規としてデータベースに保存されました。\n\n")
         
         if papers:
-            summary += "検索結果:\n"
+            parts.append("検索結果:\n")
             for i, paper in enumerate(papers, 1):
                 published_date = paper.get("published_date", "不明")
                 full_text = "（全文あり）" if paper.get("full_text_available", 0) == 1 else ""
-                summary += f"{i}. {paper['title']} ({paper['source']})\n"
-                summary += f"   発表日: {published_date}\n"
-                summary += f"   著者: {paper['authors']}\n"
-                summary += f"   URL: {paper['url']}\n"
-                summary += f"   {full_text}\n\n"
+                parts.append(f"{i}. {paper['title']} ({paper['source']})\n")
+                parts.append(f"   発表日: {published_date}\n")
+                parts.append(f"   著者: {paper['authors']}\n")
+                parts.append(f"   URL: {paper['url']}\n")
+                parts.append(f"   {full_text}\n\n")
         
-        return summary
+        return "".join(parts)
     except Exception as e:
         log_error(f"日付範囲による論文検索中にエラーが発生しました: {e}")
         return f"日付範囲による論文検索中にエラーが発生しました: {e}"
@@ -1017,7 +1169,8 @@ async def list_saved_papers_by_date(
         
         log_info(f"日付範囲で保存済み論文一覧: 期間 = {start_date}～{end_date}, キーワード = '{keyword}'")
         # 論文を検索
-        papers = paper_db.get_papers(
+        papers = await asyncio.to_thread(
+            paper_db.get_papers,
             keyword=keyword,
             source=source,
             limit=limit,
@@ -1029,25 +1182,25 @@ async def list_saved_papers_by_date(
         if not papers:
             return f"指定された日付範囲 {start_date} から {end_date} に合致する論文は見つかりませんでした。"
         
-        result = f"日付範囲 {start_date} から {end_date} の論文: 合計 {len(papers)} 件\n\n"
+        parts = [f"日付範囲 {start_date} から {end_date} の論文: 合計 {len(papers)} 件\n\n"]
         
         for paper in papers:
             full_text = "（全文あり）" if paper["full_text_available"] else ""
-            result += f"タイトル: {paper['title']} {full_text}\n"
-            result += f"著者: {paper['authors']}\n"
-            result += f"発表日: {paper['published_date']}\n"
-            result += f"ソース: {paper['source']}\n"
-            result += f"URL: {paper['url']}\n"
+            parts.append(f"タイトル: {paper['title']} {full_text}\n")
+            parts.append(f"著者: {paper['authors']}\n")
+            parts.append(f"発表日: {paper['published_date']}\n")
+            parts.append(f"ソース: {paper['source']}\n")
+            parts.append(f"URL: {paper['url']}\n")
             if paper["citation_count"] > 0:
-                result += f"引用数: {paper['citation_count']}\n"
+                parts.append(f"引用数: {paper['citation_count']}\n")
             if paper["venue"]:
-                result += f"掲載先: {paper['venue']}\n"
+                parts.append(f"掲載先: {paper['venue']}\n")
             if "abstract" in paper:
-                result += f"概要: {paper['abstract'][:200]}...\n"
-            result += f"収集日: {paper['collected_date']}\n"
-            result += "-" * 50 + "\n"
+                parts.append(f"概要: {paper['abstract'][:200]}...\n")
+            parts.append(f"収集日: {paper['collected_date']}\n")
+            parts.append("-" * 50 + "\n")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         log_error(f"日付範囲による論文一覧表示中にエラーが発生しました: {e}")
         return f"日付範囲による論文一覧表示中にエラーが発生しました: {e}"
\ No newline at end of file
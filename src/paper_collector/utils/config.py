@@ -14,7 +14,8 @@ DEFAULT_CONFIG = {
     "papers_dir": "./data/papers",
     "db_path": "./data/papers_database.db",
     "api_delay": 1.0,
-    "default_limit": 10
+    "default_limit": 10,
+    "max_concurrent_downloads": 5
 }
 
 class Config:
@@ -0,0 +1,75 @@
+"""
+Deduplication of papers collected from several sources.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+_NON_WORD = re.compile(r"[\W_]+")
+_ARXIV_VERSION = re.compile(r"v\d+$")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """
+    Normalize a title for comparison by lowercasing it and dropping punctuation and spaces.
+
+    Args:
+        title: Paper title
+
+    Returns:
+        Normalized title, empty if the title is empty
+    """
+    return _NON_WORD.sub("", (title or "").lower())
+
+
+def _paper_keys(paper: Dict[str, Any]) -> List[str]:
+    """Return the identifiers under which a paper may appear in another source."""
+    keys = []
+    if paper.get("paper_id"):
+        keys.append(f"id:{paper['paper_id']}")
+    if paper.get("doi"):
+        keys.append(f"doi:{paper['doi'].lower()}")
+    if paper.get("arxiv_id"):
+        keys.append(f"arxiv:{_ARXIV_VERSION.sub('', paper['arxiv_id'])}")
+    title = normalize_title(paper.get("title"))
+    if title:
+        keys.append(f"title:{title}")
+    return keys
+
+
+def _richness(paper: Dict[str, Any]) -> tuple:
+    """Rank records so that ones with a PDF and a longer abstract win."""
+    return (bool(paper.get("pdf_url")), len(paper.get("abstract") or ""))
+
+
+def deduplicate_papers(papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Remove papers that appear more than once, e.g. in both arXiv and Semantic Scholar.
+
+    Papers are considered the same if they share a paper ID, DOI, arXiv ID
+    (ignoring the version suffix) or normalized title. Of each group the
+    record with a PDF URL and the longest abstract is kept, in the position
+    of the first occurrence.
+
+    Args:
+        papers: List of paper dictionaries
+
+    Returns:
+        Deduplicated list of paper dictionaries
+    """
+    results: List[Dict[str, Any]] = []
+    index_by_key: Dict[str, int] = {}
+
+    for paper in papers:
+        keys = _paper_keys(paper)
+        index = next((index_by_key[key] for key in keys if key in index_by_key), None)
+
+        if index is None:
+            index = len(results)
+            results.append(paper)
+        elif _richness(paper) > _richness(results[index]):
+            results[index] = paper
+
+        for key in keys:
+            index_by_key.setdefault(key, index)
+
+    return results
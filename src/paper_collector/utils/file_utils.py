@@ -5,6 +5,8 @@ import re
 from pathlib import Path
 from typing import Optional
 
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
+
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -16,11 +18,7 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         A sanitized filename
     """
-    unsafe_chars = r'[<>:"/\\|?*]'
-    safe_filename = re.sub(unsafe_chars, '_', filename)
-    if len(safe_filename) > 200:
-        safe_filename = safe_filename[:200]
-    return safe_filename
+    return _UNSAFE_CHARS.sub('_', filename)[:200]
 
 
 def ensure_directory_exists(directory_path: str) -> None:
@@ -0,0 +1,119 @@
+"""
+Shared HTTP client for the Paper Collector package.
+"""
+import asyncio
+import random
+from typing import Any, Optional
+
+import httpx
+
+from .rate_limit import RateLimiter
+
+try:
+    # HTTP/2 needs the optional h2 package (the http2 extra)
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Retries of rate-limited requests wait RETRY_BASE_DELAY * 2**attempt seconds plus
+# jitter, capped at RETRY_MAX_DELAY, unless the server sends Retry-After
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+MAX_RETRIES = 4
+# Retries of connection attempts that failed before a request was sent
+CONNECT_RETRIES = 2
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide HTTP client, creating it on first use.
+
+    Reusing one client keeps connections to arXiv and Semantic Scholar alive
+    between requests instead of paying a TCP/TLS handshake for every call.
+    HTTP/2 is used when h2 is installed (pip install "paper-collector[http2]"),
+    multiplexing concurrent requests to the same host over one connection.
+    Must be called from within a running event loop.
+
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    # Pooled connections belong to the loop that opened them
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            # retries only covers failed connection attempts (DNS errors, resets
+            # while connecting), never requests that reached the server
+            transport=httpx.AsyncHTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                retries=CONNECT_RETRIES,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=30)
+            ),
+            timeout=30.0
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it has been created."""
+    global _client, _client_loop
+
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            print(f"HTTP client close error: {e}")
+        _client = None
+        _client_loop = None
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_MAX_DELAY)
+        except ValueError:
+            # HTTP-date form; fall back to exponential backoff
+            pass
+    delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+    # Full jitter keeps concurrent retries from hitting the server in lockstep
+    return random.uniform(delay / 2, delay)
+
+
+async def request_with_retry(method: str, url: str, rate_limiter: Optional[RateLimiter] = None,
+                             max_retries: int = MAX_RETRIES, **kwargs: Any) -> httpx.Response:
+    """
+    Send a request with the shared client, retrying when rate limited.
+
+    On HTTP 429 the request is retried up to max_retries times with
+    exponential backoff and jitter, honoring a Retry-After header in seconds.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        rate_limiter: Limiter each attempt waits on before being sent
+        max_retries: Maximum number of retries
+        **kwargs: Passed on to httpx.AsyncClient.request
+
+    Returns:
+        The last response received
+    """
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        response = await get_client().request(method, url, **kwargs)
+        if response.status_code != 429 or attempt == max_retries:
+            return response
+
+        delay = _retry_delay(response, attempt)
+        print(f"Rate limited by {response.url.host}. Retrying in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+    return response
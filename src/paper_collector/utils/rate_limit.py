@@ -0,0 +1,50 @@
+"""
+Rate limiting for calls to external APIs.
+"""
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket allowing max_rate requests per time_period.
+
+    Requests only wait once the bucket is empty, so an idle client can send
+    a burst of up to max_rate requests immediately, while the long-run rate
+    stays capped. Usable as ``async with limiter:`` from any event loop.
+    """
+
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_rate: Number of requests allowed per time period
+            time_period: Length of the time period in seconds
+        """
+        self.max_rate = max_rate
+        self.interval = time_period / max_rate
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        now = time.monotonic()
+        if self.interval > 0:
+            self._tokens = min(self.max_rate, self._tokens + (now - self._updated) / self.interval)
+        else:
+            self._tokens = self.max_rate
+        self._updated = now
+
+        # Taking the token before sleeping reserves a slot, so concurrent
+        # callers queue up behind each other instead of all waking at once
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens * self.interval)
+
+    async def __aenter__(self) -> "RateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
@@ -9,10 +9,12 @@ import json
 from datetime import datetime
 import asyncio
 
+import httpx
 import pytest
 
 from paper_collector.api.arxiv_client import ArxivClient
 from paper_collector.api.semantic_scholar_client import SemanticScholarClient
+from paper_collector.db.database import PaperDatabase
 
 class TestArxivClient(unittest.TestCase):
     """ArxivClient クラスのテスト"""
@@ -78,6 +80,102 @@ class TestArxivClient(unittest.TestCase):
         self.assertEqual(paper["paper_id"], "1234.5678v1")
         self.assertEqual(paper["published_date"], "2025-01-01")
         
+    def test_get_citation_data_uses_cache(self):
+        """取得した引用データと見つからなかった論文がキャッシュされ、再検索でリクエストされないことをテスト"""
+        cache = PaperDatabase(os.path.join(self.temp_dir, "cache.db"))
+        client = ArxivClient(self.temp_dir, 0.01, citation_cache=cache)
+        requests = []
+        
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json=[{"citationCount": 12, "venue": "NeurIPS"}, None])
+        
+        async def run():
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("paper_collector.utils.http_client.get_client", return_value=http_client), \
+                 patch("paper_collector.api.arxiv_client.asyncio.to_thread",
+                       side_effect=asyncio.to_thread) as mock_to_thread:
+                first = await client._get_citation_data(["1234.5678v2", "9999.0000v1"])
+                second = await client._get_citation_data(["1234.5678v1", "9999.0000v1"])
+            await http_client.aclose()
+            return first, second, mock_to_thread
+        
+        try:
+            first, second, mock_to_thread = asyncio.run(run())
+        finally:
+            cache.close()
+        
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0]["citation_count"], 12)
+        self.assertEqual(second[1]["citation_count"], 0)
+        # キャッシュの読み書きはイベントループを塞がないようワーカースレッドで行われる
+        called = [call.args[0] for call in mock_to_thread.call_args_list]
+        self.assertEqual(called, [cache.get_cached_citations, cache.save_cached_citations,
+                                  cache.get_cached_citations])
+        
+    def test_search_uses_response_cache(self):
+        """同じ検索の2回目はarXivに問い合わせずキャッシュから結果を返すことをテスト"""
+        cache = PaperDatabase(os.path.join(self.temp_dir, "cache.db"))
+        client = ArxivClient(self.temp_dir, 0.01, response_cache=cache)
+        mock_arxiv = MagicMock()
+        mock_arxiv.results.side_effect = lambda search: iter([self.mock_arxiv_entry])
+        self.mock_arxiv_entry.doi = None
+        for i, author in enumerate(self.mock_arxiv_entry.authors, 1):
+            author.name = f"著者{i}"
+        
+        async def run():
+            with patch.object(client, "_get_arxiv_client", return_value=mock_arxiv), \
+                 patch.object(client, "_get_citation_data", side_effect=lambda ids: [{} for _ in ids]), \
+                 patch("paper_collector.api.arxiv_client.asyncio.to_thread",
+                       side_effect=asyncio.to_thread) as mock_to_thread:
+                first = await client.search("テストクエリ", 5, download=False)
+                second = await client.search("テストクエリ", 5, download=False)
+                dated = await client.search_by_date("テストクエリ", "20250101", "20250131", 5, download=False)
+            return first, second, dated, mock_to_thread
+        
+        try:
+            first, second, dated, mock_to_thread = asyncio.run(run())
+        finally:
+            cache.close()
+        
+        # キャッシュの読み書きはイベントループを塞がないようワーカースレッドで行われる
+        called = [call.args[0] for call in mock_to_thread.call_args_list]
+        self.assertEqual(called.count(cache.get_cached_response), 3)
+        self.assertEqual(called.count(cache.save_cached_response), 2)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first[0]["paper_id"], "1234.5678v1")
+        self.assertEqual(first[0]["authors"], "著者1, 著者2")
+        self.assertEqual(first[0]["published_date"], 2025)
+        # 日付範囲の検索は別のクエリとして問い合わせられる
+        self.assertEqual(mock_arxiv.results.call_count, 2)
+        self.assertEqual(dated[0]["published_date"], "2025-01-01")
+        
+    def test_get_citation_data_batch(self):
+        """引用データがバッチエンドポイントから一括取得され、入力順に対応付けられることをテスト"""
+        requests = []
+        
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json=[{"citationCount": 12, "venue": "NeurIPS"}, None])
+        
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("paper_collector.utils.http_client.get_client", return_value=client):
+                results = await self.arxiv_client._get_citation_data(["1234.5678v2", "9999.0000v1"])
+            await client.aclose()
+            return results
+        
+        results = asyncio.run(run())
+        
+        # バージョン番号を除いたIDで1回だけリクエストされる
+        self.assertEqual(requests, [{"ids": ["arXiv:1234.5678", "arXiv:9999.0000"]}])
+        self.assertEqual(results[0]["citation_count"], 12)
+        self.assertEqual(results[0]["venue"], "NeurIPS")
+        # 見つからなかった論文は既定値になる
+        self.assertEqual(results[1]["citation_count"], 0)
+        
     @pytest.mark.asyncio
     @patch("paper_collector.api.arxiv_client.requests.get")
     async def test_download_pdf(self, mock_get):
@@ -140,8 +238,41 @@ class TestSemanticScholarClient(unittest.TestCase):
                 os.rmdir(os.path.join(root, name))
         os.rmdir(self.temp_dir)
     
+    def test_get_json_uses_response_cache(self):
+        """同じリクエストの2回目はキャッシュから返され、キャッシュはワーカースレッドで読み書きされることをテスト"""
+        cache = PaperDatabase(os.path.join(self.temp_dir, "cache.db"))
+        client = SemanticScholarClient(self.temp_dir, 0.01, response_cache=cache)
+        requests = []
+        
+        def handler(request):
+            requests.append(request.url)
+            return httpx.Response(200, json=self.mock_ss_response)
+        
+        async def run():
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("paper_collector.utils.http_client.get_client", return_value=http_client), \
+                 patch("paper_collector.api.semantic_scholar_client.asyncio.to_thread",
+                       side_effect=asyncio.to_thread) as mock_to_thread:
+                url = f"{client.api_base_url}/paper/search"
+                first = await client._get_json(url, {"query": "テスト"})
+                second = await client._get_json(url, {"query": "テスト"})
+            await http_client.aclose()
+            return first, second, mock_to_thread
+        
+        try:
+            first, second, mock_to_thread = asyncio.run(run())
+        finally:
+            cache.close()
+        
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(first, self.mock_ss_response)
+        self.assertEqual(second, self.mock_ss_response)
+        called = [call.args[0] for call in mock_to_thread.call_args_list]
+        self.assertEqual(called, [cache.get_cached_response, cache.save_cached_response,
+                                  cache.get_cached_response])
+    
     @pytest.mark.asyncio
-    @patch("paper_collector.api.semantic_scholar_client.httpx.AsyncClient.get")
+    @patch("httpx.AsyncClient.get")
     async def test_search(self, mock_get):
         """検索機能のテスト"""
         # モック応答の設定
@@ -164,7 +295,7 @@ class TestSemanticScholarClient(unittest.TestCase):
         self.assertEqual(paper["venue"], "AI Conference")
         
     @pytest.mark.asyncio
-    @patch("paper_collector.api.semantic_scholar_client.httpx.AsyncClient.get")
+    @patch("httpx.AsyncClient.get")
     async def test_search_with_citations(self, mock_get):
         """引用数を含む検索のテスト"""
         # モック応答の設定
@@ -184,7 +315,7 @@ class TestSemanticScholarClient(unittest.TestCase):
         self.assertEqual(len(papers), 0)  # モック応答では引用数100なので条件を満たさない
         
     @pytest.mark.asyncio
-    @patch("paper_collector.api.semantic_scholar_client.httpx.AsyncClient.get")
+    @patch("httpx.AsyncClient.get")
     async def test_search_by_date(self, mock_get):
         """日付範囲検索のテスト"""
         # モック応答の設定
@@ -143,5 +143,227 @@ class TestPaperDatabase(unittest.TestCase):
         self.assertEqual(paper["full_text"], full_text)
         self.assertEqual(paper["full_text_available"], 1)
 
+    def test_save_full_texts(self):
+        """複数の全文の一括保存をテスト"""
+        other_paper = self.sample_paper.copy()
+        other_paper["paper_id"] = "test456"
+        self.db.save_papers([self.sample_paper, other_paper])
+        
+        saved = self.db.save_full_texts([("test123", "一件目の全文"), ("test456", "二件目の全文"),
+                                         ("test789", None)])
+        
+        self.assertEqual(saved, 2)
+        self.assertEqual(self.db.get_paper_by_id("test456")["full_text"], "二件目の全文")
+        self.assertEqual(self.db.count_full_text_papers(), 2)
+    
+    def test_mark_full_text_unavailable(self):
+        """全文を抽出できなかった論文が未抽出の一覧から外れることをテスト"""
+        paper = self.sample_paper.copy()
+        paper["pdf_path"] = "/tmp/test123.pdf"
+        paper["full_text_available"] = 1
+        other_paper = paper.copy()
+        other_paper["paper_id"] = "test456"
+        other_paper["pdf_path"] = "/tmp/test456.pdf"
+        self.db.save_papers([paper, other_paper])
+        self.assertEqual(len(self.db.get_papers_without_full_text()), 2)
+        
+        updated = self.db.mark_full_text_unavailable(["test456"])
+        
+        self.assertEqual(updated, 1)
+        pending = self.db.get_papers_without_full_text()
+        self.assertEqual([paper["paper_id"] for paper in pending], ["test123"])
+        self.assertEqual(self.db.get_paper_by_id("test456")["full_text_available"], 0)
+    
+    def test_search_full_text(self):
+        """全文検索をテスト"""
+        self.db.save_papers([self.sample_paper])
+        self.db.save_full_text("test123", "We propose a Self-Attention based Transformer model.")
+        
+        # 大文字小文字を区別しない部分一致
+        results = self.db.search_full_text("self-attention")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["paper_id"], "test123")
+        self.assertIn("Self-Attention", results[0]["context"])
+        
+        # ワイルドカード検索と3文字未満の検索語
+        self.assertEqual(len(self.db.search_full_text("transform*model")), 1)
+        self.assertEqual(len(self.db.search_full_text("We")), 1)
+        self.assertEqual(len(self.db.search_full_text("convolution")), 0)
+        
+        # 全文を更新するとインデックスも更新される
+        self.db.save_full_text("test123", "畳み込みニューラルネットワーク")
+        self.assertEqual(len(self.db.search_full_text("self-attention")), 0)
+        self.assertEqual(len(self.db.search_full_text("ニューラル")), 1)
+
+    def test_search_full_text_ranking(self):
+        """全文検索の結果が関連度（BM25）の高い順に並ぶことをテスト"""
+        newer = self.sample_paper.copy()
+        newer["paper_id"] = "test456"
+        self.db.save_papers([self.sample_paper.copy()], collected_date="2025-01-01")
+        self.db.save_papers([newer], collected_date="2025-02-01")
+        self.db.save_full_texts([
+            ("test123", "attention attention attention"),
+            ("test456", "attention is mentioned once in a much longer text about other topics"),
+        ])
+        
+        results = self.db.search_full_text("attention")
+        self.assertEqual([r["paper_id"] for r in results], ["test123", "test456"])
+
+    def test_search_full_text_cache(self):
+        """検索で読み込んだ全文がキャッシュされ、全文の更新で破棄されることをテスト"""
+        self.db.save_papers([self.sample_paper.copy()])
+        self.db.save_full_texts([("test123", "cached attention text")])
+        
+        self.assertEqual(len(self.db.search_full_text("attention")), 1)
+        self.assertEqual(self.db._full_text_cache["test123"], "cached attention text")
+        
+        # 一括保存でも論文の再保存でもキャッシュが古い全文を返さない
+        self.db.save_full_texts([("test123", "updated convolution text")])
+        self.assertEqual(len(self.db.search_full_text("attention")), 0)
+        self.assertEqual(len(self.db.search_full_text("convolution")), 1)
+        
+        paper = self.sample_paper.copy()
+        paper["full_text_available"] = 1
+        paper["full_text"] = "recurrent network text"
+        self.db.save_papers([paper])
+        self.assertEqual(len(self.db.search_full_text("convolution")), 0)
+        self.assertEqual(len(self.db.search_full_text("recurrent")), 1)
+        
+        # 全文の取得も同じキャッシュを使う
+        self.assertEqual(self.db.get_full_text("test123"), "recurrent network text")
+        self.assertIsNone(self.db.get_full_text("unknown"))
+
+    def test_vacuum_rebuilds_fts_index(self):
+        """VACUUMで行番号が変わっても全文検索インデックスが再構築されることをテスト"""
+        self.db.save_papers([self.sample_paper.copy()])
+        self.db.save_full_text("test123", "attention is all you need")
+        
+        # VACUUMによる行番号の振り直しを再現する（インデックスは古い行番号のまま残る）
+        with self.db._connect() as conn:
+            conn.execute("UPDATE papers SET rowid = rowid + 100")
+        self.db._full_text_cache.clear()
+        
+        self.db.vacuum()
+        self.assertEqual(len(self.db.search_full_text("attention")), 1)
+        self.assertEqual(len(self.db.get_papers(keyword="テスト用")), 1)
+
+    def test_keyword_search_uses_all_text_columns(self):
+        """キーワード検索がタイトル・概要・キーワード・著者を対象とすることをテスト"""
+        paper = self.sample_paper.copy()
+        paper["authors"] = "Geoffrey Hinton"
+        self.db.save_papers([paper])
+        
+        self.assertEqual(len(self.db.get_papers(keyword="hinton")), 1)
+        self.assertEqual(len(self.db.get_papers(keyword="テスト用")), 1)
+        # 3文字未満のキーワードも検索できる
+        self.assertEqual(len(self.db.get_papers(keyword="論文")), 1)
+        
+        # 概要を更新するとインデックスも更新される
+        paper["abstract"] = "Updated abstract"
+        self.db.save_papers([paper])
+        self.assertEqual(len(self.db.get_papers(keyword="テスト用")), 0)
+        self.assertEqual(len(self.db.get_papers(keyword="updated")), 1)
+    
+    def test_save_papers_with_full_text(self):
+        """論文と同時に全文を保存し、全文なしの更新では保持されることをテスト"""
+        paper_with_text = self.sample_paper.copy()
+        paper_with_text["full_text_available"] = 1
+        paper_with_text["full_text"] = "Eagerly extracted text."
+        self.db.save_papers([paper_with_text])
+        
+        self.assertEqual(len(self.db.search_full_text("eagerly")), 1)
+        
+        # 全文を含まない再保存で既存の全文が消えないこと
+        self.db.save_papers([self.sample_paper.copy()])
+        paper = self.db.get_paper_by_id("test123")
+        self.assertEqual(paper["full_text"], "Eagerly extracted text.")
+        
+        # 一覧・詳細用の取得では全文を読み込まない
+        self.assertNotIn("full_text", self.db.get_papers()[0])
+        self.assertNotIn("full_text", self.db.get_paper_by_id("test123", include_full_text=False))
+
+    def test_save_papers_batch(self):
+        """新規・既存・同一バッチ内の重複が混在する一括保存をテスト"""
+        self.db.save_papers([self.sample_paper])
+        
+        updated = self.sample_paper.copy()
+        updated["citation_count"] = 7
+        new_paper = self.sample_paper.copy()
+        new_paper["paper_id"] = "test789"
+        new_paper_again = new_paper.copy()
+        new_paper_again["title"] = "後から来たタイトル"
+        
+        saved = self.db.save_papers([updated, new_paper, new_paper_again])
+        
+        # 同じバッチで2回現れた論文は1件として数え、後の内容で更新される
+        self.assertEqual(saved, 1)
+        self.assertEqual(self.db.get_paper_by_id("test123")["citation_count"], 7)
+        self.assertEqual(self.db.get_paper_by_id("test789")["title"], "後から来たタイトル")
+    
+    def test_save_papers_with_new_ids(self):
+        """一括保存で新規に追加された論文のIDだけが返されることをテスト"""
+        self.db.save_papers([self.sample_paper.copy()])
+        new_paper = self.sample_paper.copy()
+        new_paper["paper_id"] = "test456"
+        
+        new_ids = self.db.save_papers_with_new_ids([self.sample_paper.copy(), new_paper])
+        self.assertEqual(new_ids, {"test456"})
+        self.assertEqual(self.db.save_papers_with_new_ids([]), set())
+    
+    def test_save_papers_keeps_collected_date(self):
+        """既存論文の再保存では最初の収集日が保持されることをテスト"""
+        self.db.save_papers([self.sample_paper.copy()], collected_date="2025-01-01")
+        self.db.save_papers([self.sample_paper.copy()], collected_date="2025-02-01")
+        
+        self.assertEqual(self.db.get_paper_by_id("test123")["collected_date"], "2025-01-01")
+    
+    def test_get_paper_by_title(self):
+        """IDが一致しない場合にタイトルの部分一致で論文を取得できることをテスト"""
+        other_paper = self.sample_paper.copy()
+        other_paper["paper_id"] = "test456"
+        other_paper["title"] = "test123 を題名に含む論文"
+        self.db.save_papers([self.sample_paper, other_paper])
+        
+        # IDの完全一致がタイトルの部分一致より優先される
+        self.assertEqual(self.db.get_paper_by_id("test123")["paper_id"], "test123")
+        self.assertEqual(self.db.get_paper_by_id("題名")["paper_id"], "test456")
+        self.assertIsNone(self.db.get_paper_by_id("存在しない論文"))
+    
+    def test_citation_cache(self):
+        """引用データのキャッシュが保存・取得でき、古いエントリは無視されることをテスト"""
+        citation = {"citation_count": 42, "venue": "テスト会議", "venue_impact_score": 0.0}
+        self.db.save_cached_citations({"arXiv:2101.00001": citation})
+        
+        cached = self.db.get_cached_citations(["arXiv:2101.00001", "arXiv:2101.00002"])
+        self.assertEqual(cached, {"arXiv:2101.00001": citation})
+        
+        # 有効期限を過ぎたエントリはキャッシュミスになる
+        self.assertEqual(self.db.get_cached_citations(["arXiv:2101.00001"], max_age=-1), {})
+    
+    def test_response_cache(self):
+        """APIレスポンスのキャッシュが保存・取得でき、古いエントリは無視されることをテスト"""
+        self.assertIsNone(self.db.get_cached_response("key1"))
+        
+        self.db.save_cached_response("key1", '{"data": []}')
+        self.assertEqual(self.db.get_cached_response("key1"), '{"data": []}')
+        self.assertIsNone(self.db.get_cached_response("key1", max_age=-1))
+    
+    def test_expired_cache_entries_are_deleted_on_write(self):
+        """有効期限を過ぎたキャッシュ行が次の書き込み時に削除されることをテスト"""
+        self.db.save_cached_citations({"arXiv:2101.00001": {"citation_count": 1}})
+        self.db.save_cached_response("key1", "{}")
+        with self.db._connect() as conn:
+            conn.execute("UPDATE citations_cache SET fetched_at = 0")
+            conn.execute("UPDATE api_response_cache SET fetched_at = 0")
+        
+        self.db.save_cached_citations({"arXiv:2101.00002": {"citation_count": 2}})
+        self.db.save_cached_response("key2", "{}")
+        
+        with self.db._connect() as conn:
+            citation_ids = [row[0] for row in conn.execute("SELECT paper_id FROM citations_cache")]
+            response_keys = [row[0] for row in conn.execute("SELECT key FROM api_response_cache")]
+        self.assertEqual(citation_ids, ["arXiv:2101.00002"])
+        self.assertEqual(response_keys, ["key2"])
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+論文の重複除去に関するテストコード
+"""
+import unittest
+
+from paper_collector.utils.dedup import deduplicate_papers, normalize_title
+
+class TestDeduplicatePapers(unittest.TestCase):
+    """deduplicate_papers 関数のテスト"""
+    
+    def test_normalize_title(self):
+        """タイトルの正規化をテスト"""
+        self.assertEqual(normalize_title("Attention Is All You Need!"), "attentionisallyouneed")
+        self.assertEqual(normalize_title(None), "")
+    
+    def test_deduplicate_across_sources(self):
+        """arXiv と Semantic Scholar の同じ論文が1件にまとめられることをテスト"""
+        arxiv_paper = {
+            "paper_id": "1706.03762v7",
+            "title": "Attention Is All You Need",
+            "abstract": "短い概要",
+            "pdf_url": "http://arxiv.org/pdf/1706.03762v7",
+            "arxiv_id": "1706.03762v7",
+            "source": "arXiv",
+        }
+        semantic_paper = {
+            "paper_id": "204e3073870fae3d05bcbc2f6a8e263d9b72e776",
+            "title": "Attention is All you Need",
+            "abstract": "より長い概要のテキストです。",
+            "pdf_url": None,
+            "arxiv_id": "1706.03762",
+            "source": "Semantic Scholar",
+        }
+        other_paper = {
+            "paper_id": "other",
+            "title": "BERT",
+            "abstract": "",
+            "source": "Semantic Scholar",
+        }
+        
+        papers = deduplicate_papers([arxiv_paper, semantic_paper, other_paper])
+        
+        # PDF のある記録が優先される
+        self.assertEqual([p["paper_id"] for p in papers], ["1706.03762v7", "other"])
+    
+    def test_prefer_richer_record(self):
+        """同じ DOI の論文では、より詳しい記録が残ることをテスト"""
+        first = {"paper_id": "a", "title": "タイトルA", "doi": "10.1/X", "abstract": ""}
+        second = {"paper_id": "b", "title": "タイトルB", "doi": "10.1/x", "abstract": "概要"}
+        
+        papers = deduplicate_papers([first, second])
+        
+        self.assertEqual(len(papers), 1)
+        self.assertEqual(papers[0]["paper_id"], "b")
+
+if __name__ == "__main__":
+    unittest.main()
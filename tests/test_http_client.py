@@ -0,0 +1,78 @@
+"""
+共有HTTPクライアントに関するテストコード
+"""
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from paper_collector.utils.http_client import close_client, get_client, request_with_retry
+
+class TestHttpClient(unittest.TestCase):
+    """get_client / close_client / request_with_retry 関数のテスト"""
+
+    def tearDown(self):
+        """テスト後に共有クライアントを閉じる"""
+        asyncio.run(close_client())
+
+    def test_client_is_reused_within_loop(self):
+        """同じイベントループ内では同じクライアントが再利用されることをテスト"""
+        async def get_twice():
+            return get_client(), get_client()
+
+        first, second = asyncio.run(get_twice())
+        self.assertIs(first, second)
+
+    def test_client_is_recreated_after_close(self):
+        """クライアントを閉じた後や別のイベントループでは新しいクライアントが作られることをテスト"""
+        async def get_and_close():
+            client = get_client()
+            await close_client()
+            return client, client.is_closed, get_client()
+
+        closed_client, is_closed, new_client = asyncio.run(get_and_close())
+        self.assertTrue(is_closed)
+        self.assertIsNot(closed_client, new_client)
+
+        # 別のループでは前のループの接続を使わない
+        async def get_once():
+            return get_client()
+
+        self.assertIsNot(asyncio.run(get_once()), new_client)
+
+    def test_request_with_retry(self):
+        """429 のレスポンスは Retry-After に従って再試行されることをテスト"""
+        statuses = iter([429, 429, 200])
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(next(statuses), headers={"Retry-After": "0"})
+
+        async def send():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("paper_collector.utils.http_client.get_client", return_value=client):
+                response = await request_with_retry("GET", "https://example.com/api")
+            await client.aclose()
+            return response
+
+        self.assertEqual(asyncio.run(send()).status_code, 200)
+        self.assertEqual(len(requests), 3)
+
+    def test_request_with_retry_gives_up(self):
+        """再試行回数を超えた場合は最後の 429 レスポンスを返すことをテスト"""
+        def handler(request):
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        async def send():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("paper_collector.utils.http_client.get_client", return_value=client):
+                response = await request_with_retry("GET", "https://example.com/api", max_retries=1)
+            await client.aclose()
+            return response
+
+        self.assertEqual(asyncio.run(send()).status_code, 429)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,20 @@
 """
 PDF処理に関するテストコード
 """
+import asyncio
 import os
 import tempfile
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
-from paper_collector.pdf.pdf_handler import extract_text_from_pdf
+import fitz
+import httpx
+
+from paper_collector.pdf.pdf_handler import (
+    TEXT_FLAGS, download_pdf, download_pdfs, extract_text_from_pdf,
+    extract_texts_from_pdfs_async
+)
 
 class TestPDFHandler(unittest.TestCase):
     """PDF処理機能のテスト"""
@@ -46,6 +54,9 @@ class TestPDFHandler(unittest.TestCase):
         expected_text = "これは1ページ目のテキストです。これは2ページ目のテキストです。"
         self.assertEqual(text, expected_text)
         mock_fitz_open.assert_called_once_with(self.test_pdf_path)
+        # プレーンテキスト用のフラグで抽出し、ドキュメントを確実に閉じること
+        mock_page1.get_text.assert_called_once_with("text", flags=TEXT_FLAGS)
+        mock_doc.close.assert_called_once()
         
     @patch('paper_collector.pdf.pdf_handler.fitz.open')
     def test_extract_text_from_invalid_pdf(self, mock_fitz_open):
@@ -70,5 +81,209 @@ class TestPDFHandler(unittest.TestCase):
         # 結果確認 (エラーの場合はNoneが返される)
         self.assertIsNone(text)
 
+    def test_extract_texts_from_pdfs_async(self):
+        """複数PDFの全文が1件ずつワーカースレッドで抽出され、入力順に返されることをテスト"""
+        pdf_dir = tempfile.mkdtemp()
+        paths = []
+        for i in range(3):
+            path = os.path.join(pdf_dir, f"{i}.pdf")
+            doc = fitz.open()
+            doc.new_page().insert_text((72, 72), f"Paper number {i}")
+            doc.save(path)
+            doc.close()
+            paths.append(path)
+        missing = os.path.join(pdf_dir, "missing.pdf")
+        
+        running = 0
+        max_running = 0
+        
+        async def counting_extract(pdf_path, max_pages=500):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            try:
+                return await asyncio.to_thread(extract_text_from_pdf, pdf_path, max_pages)
+            finally:
+                running -= 1
+        
+        try:
+            with patch('paper_collector.pdf.pdf_handler.extract_text_from_pdf_async',
+                       side_effect=counting_extract) as mock_extract:
+                texts = asyncio.run(extract_texts_from_pdfs_async([paths[2], missing, paths[0], paths[1], paths[0]]))
+            
+            self.assertIn("Paper number 2", texts[0])
+            self.assertIsNone(texts[1])
+            self.assertIn("Paper number 0", texts[2])
+            self.assertIn("Paper number 1", texts[3])
+            self.assertEqual(texts[4], texts[2])
+            # 存在しないファイルと重複は抽出されず、同時に使うスレッドは1つだけ
+            self.assertEqual(mock_extract.call_count, 3)
+            self.assertEqual(max_running, 1)
+        finally:
+            for path in paths:
+                os.remove(path)
+            os.rmdir(pdf_dir)
+
+    def test_download_pdf_resumes_partial_file(self):
+        """中断されたダウンロードがRangeリクエストで続きから再開されることをテスト"""
+        body = b'%PDF-1.4\n' + b'0' * 1000
+        requests = []
+        
+        def handler(request):
+            requests.append(request.headers.get("range"))
+            start = int(request.headers["range"][len("bytes="):-1])
+            return httpx.Response(206, content=body[start:])
+        
+        papers_dir = tempfile.mkdtemp()
+        file_path = os.path.join(papers_dir, "1234.5678.pdf")
+        with open(file_path + ".part", 'wb') as f:
+            f.write(body[:300])
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await download_pdf("https://example.com/paper.pdf", "1234.5678",
+                                          papers_dir, client=client)
+        
+        try:
+            self.assertEqual(asyncio.run(run()), file_path)
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), body)
+            self.assertEqual(requests, ["bytes=300-"])
+            # 完了後は一時ファイルが残らない
+            self.assertFalse(os.path.exists(file_path + ".part"))
+        finally:
+            os.remove(file_path)
+            os.rmdir(papers_dir)
+    
+    def test_download_pdf_revalidates_old_file(self):
+        """古いPDFはサイズが一致しなければ再ダウンロードされ、一致すれば再確認が1週間省略されることをテスト"""
+        body = b'%PDF-1.4\n' + b'0' * 1000
+        requests = []
+        
+        def handler(request):
+            requests.append(request.method)
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"content-length": str(len(body))})
+            return httpx.Response(200, content=body)
+        
+        papers_dir = tempfile.mkdtemp()
+        file_path = os.path.join(papers_dir, "1234.5678.pdf")
+        with open(file_path, 'wb') as f:
+            f.write(body[:300])
+        week_ago = time.time() - 8 * 24 * 60 * 60
+        os.utime(file_path, (week_ago, week_ago))
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await download_pdf("https://example.com/paper.pdf", "1234.5678",
+                                          papers_dir, client=client)
+        
+        try:
+            self.assertEqual(asyncio.run(run()), file_path)
+            with open(file_path, 'rb') as f:
+                self.assertEqual(f.read(), body)
+            self.assertEqual(requests, ["HEAD", "GET"])
+            
+            # サイズが一致した古いPDFはHEADだけで確認され、その後1週間は確認されない
+            os.utime(file_path, (week_ago, week_ago))
+            requests.clear()
+            self.assertEqual(asyncio.run(run()), file_path)
+            self.assertEqual(requests, ["HEAD"])
+            self.assertEqual(asyncio.run(run()), file_path)
+            self.assertEqual(requests, ["HEAD"])
+        finally:
+            os.remove(file_path)
+            os.rmdir(papers_dir)
+    
+    def test_concurrent_downloads_are_coalesced(self):
+        """同じ論文の同時ダウンロードが1回のリクエストにまとめられることをテスト"""
+        body = b'%PDF-1.4\n' + b'0' * 1000
+        requests = []
+        
+        def handler(request):
+            requests.append(request.method)
+            return httpx.Response(200, content=body)
+        
+        papers_dir = tempfile.mkdtemp()
+        file_path = os.path.join(papers_dir, "1234.5678.pdf")
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await asyncio.gather(*(
+                    download_pdf("https://example.com/paper.pdf", "1234.5678", papers_dir, client=client)
+                    for _ in range(3)
+                ))
+        
+        try:
+            self.assertEqual(asyncio.run(run()), [file_path] * 3)
+            self.assertEqual(requests, ["GET"])
+        finally:
+            os.remove(file_path)
+            os.rmdir(papers_dir)
+    
+    @patch('paper_collector.pdf.pdf_handler._download_pdf')
+    def test_download_pdfs_skips_existing_files(self, mock_download_pdf):
+        """保存済みの新しいPDFはダウンロード処理を経ずにそのまま使われることをテスト"""
+        papers_dir = tempfile.mkdtemp()
+        file_path = os.path.join(papers_dir, "1234.5678.pdf")
+        with open(file_path, 'wb') as f:
+            f.write(b'%PDF-1.4\n')
+        papers = [
+            {"paper_id": "1234.5678", "pdf_url": "https://example.com/paper.pdf"},
+            {"paper_id": "no-pdf", "pdf_url": None},
+        ]
+        
+        try:
+            asyncio.run(download_pdfs(papers, papers_dir))
+            mock_download_pdf.assert_not_called()
+            self.assertEqual(papers[0]["pdf_path"], file_path)
+            self.assertEqual(papers[0]["full_text_available"], 1)
+            self.assertIsNone(papers[1]["pdf_path"])
+            self.assertEqual(papers[1]["full_text_available"], 0)
+        finally:
+            os.remove(file_path)
+            os.rmdir(papers_dir)
+
+    def test_download_pdfs_extracts_only_written_files(self):
+        """サイズ確認だけで済んだ古いPDFは再抽出されず、再ダウンロードしたPDFだけが抽出されることをテスト"""
+        body = b'%PDF-1.4\n' + b'0' * 1000
+        
+        def handler(request):
+            if request.method == "HEAD":
+                return httpx.Response(200, headers={"content-length": str(len(body))})
+            return httpx.Response(200, content=body)
+        
+        papers_dir = tempfile.mkdtemp()
+        week_ago = time.time() - 8 * 24 * 60 * 60
+        # 1件目はサイズが一致する古いPDF、2件目は途中までしかない古いPDF
+        for paper_id, content in (("same", body), ("changed", body[:300])):
+            path = os.path.join(papers_dir, f"{paper_id}.pdf")
+            with open(path, 'wb') as f:
+                f.write(content)
+            os.utime(path, (week_ago, week_ago))
+        papers = [
+            {"paper_id": "same", "pdf_url": "https://example.com/same.pdf"},
+            {"paper_id": "changed", "pdf_url": "https://example.com/changed.pdf"},
+        ]
+        
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                with patch('paper_collector.pdf.pdf_handler.get_client', return_value=client), \
+                     patch('paper_collector.pdf.pdf_handler.extract_text_from_pdf_async',
+                           new=AsyncMock(return_value="extracted")) as mock_extract:
+                    await download_pdfs(papers, papers_dir)
+                return mock_extract
+        
+        try:
+            mock_extract = asyncio.run(run())
+            mock_extract.assert_awaited_once_with(os.path.join(papers_dir, "changed.pdf"))
+            self.assertNotIn("full_text", papers[0])
+            self.assertEqual(papers[1]["full_text"], "extracted")
+            self.assertEqual(papers[0]["full_text_available"], 1)
+        finally:
+            for name in os.listdir(papers_dir):
+                os.remove(os.path.join(papers_dir, name))
+            os.rmdir(papers_dir)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
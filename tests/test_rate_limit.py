@@ -0,0 +1,34 @@
+"""
+レート制限に関するテストコード
+"""
+import asyncio
+import time
+import unittest
+
+from paper_collector.utils.rate_limit import RateLimiter
+
+class TestRateLimiter(unittest.TestCase):
+    """RateLimiter クラスのテスト"""
+
+    def _elapsed(self, limiter, count):
+        """count 回のリクエスト許可を並行して待ち、かかった秒数を返す"""
+        async def acquire_all():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire() for _ in range(count)))
+            return time.monotonic() - start
+
+        return asyncio.run(acquire_all())
+
+    def test_burst_is_not_delayed(self):
+        """バケットが空になるまでのリクエストは待たされないことをテスト"""
+        self.assertLess(self._elapsed(RateLimiter(3, 1.0), 3), 0.1)
+
+    def test_requests_are_spaced_after_burst(self):
+        """バケットが空になった後は一定間隔で許可されることをテスト"""
+        # 2件まではすぐに、残り2件は 0.1 秒間隔で許可される
+        elapsed = self._elapsed(RateLimiter(2, 0.2), 4)
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertLess(elapsed, 0.5)
+
+if __name__ == "__main__":
+    unittest.main()